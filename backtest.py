@@ -0,0 +1,313 @@
+import argparse
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from indicators import MIN_BARS, panel, rsi, sma
+
+# Backtest aturan screening + money management (SL/TP/lot) dari streamlit_app.py.
+# Indikator dihitung sekali untuk seluruh histori (array tanggal x ticker), simulasi
+# berjalan per hari dengan operasi vektor lintas ticker, dan grid parameter dibagi
+# ke semua core lewat ProcessPoolExecutor.
+# Perkiraan: filter mcap_min memakai market cap HARI INI (cache fundamentals) untuk
+# seluruh histori, karena market cap historis tidak tersedia dari Yahoo. Saham yang
+# dulu kecil tapi sekarang besar (dan sebaliknya) jadi ikut / tidak ikut tersaring.
+
+DEFAULT_PARAMS = {
+    "rsi_min": 53,
+    "vol_ratio_min": 2.0,
+    "pct_1m_min": 12,
+    "mcap_min": 2.0,       # Triliun IDR, market cap hari ini (lihat catatan di atas)
+    "total_budget": 10_000_000,
+    "risk_per_trade": 1.0,
+    "max_hold": 20,        # Hari bursa; posisi ditutup di close jika SL/TP belum kena
+    "fee_buy": 0.0015,     # Perkiraan fee broker IDX
+    "fee_sell": 0.0025,
+}
+
+
+def _scatter_back(values, order):
+    out = np.full(values.shape, np.nan)
+    np.put_along_axis(out, order, values, axis=0)
+    return out
+
+
+def prepare(data, tickers=None, mcaps=None):
+    """
+    Hitung semua indikator untuk setiap hari dan ticker. Seperti scan, tiap ticker
+    hanya melihat bar miliknya sendiri (NaN di-skip), lalu hasilnya dikembalikan
+    ke grid tanggal. Mengembalikan dict array (T x N) + daftar tanggal & ticker.
+    `mcaps` (ticker -> market cap IDR) dipakai filter mcap_min; None = filter tidak aktif.
+    """
+    close_df = panel(data, "Close", tickers)
+    cols = list(close_df.columns)
+    fields = {f: panel(data, f, cols).reindex(index=close_df.index, columns=cols).to_numpy()
+              for f in ("Open", "High", "Low", "Volume")}
+    close = close_df.to_numpy()
+
+    valid = ~np.isnan(close)
+    order = np.argsort(valid, axis=0, kind="stable")
+    c = np.take_along_axis(close, order, axis=0)
+    v = np.nan_to_num(np.take_along_axis(fields["Volume"], order, axis=0), nan=0.0)
+    cvalid = np.take_along_axis(valid, order, axis=0)
+    bars = np.cumsum(cvalid, axis=0)
+
+    # Rata-rata volume 20 bar terakhir (atau semua bar jika lebih sedikit)
+    vsum = np.cumsum(v, axis=0)
+    vsum20 = vsum.copy()
+    vsum20[20:] -= vsum[:-20]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        avg_vol = vsum20 / np.minimum(bars, 20)
+        vol_ratio = np.where(avg_vol > 0, v / avg_vol, 0.0)
+
+    # % change 1 bulan: 20 bar sebelumnya, atau bar pertama jika data lebih pendek
+    n_rows = c.shape[0]
+    rows = np.arange(n_rows)[:, None]
+    first_row = n_rows - valid.sum(axis=0)
+    prev_row = np.maximum(rows - 20, first_row)
+    prev_close = np.take_along_axis(c, np.clip(prev_row, 0, n_rows - 1), axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        pct_1m = (c - prev_close) / prev_close * 100
+
+    prepared = {
+        "dates": close_df.index,
+        "tickers": cols,
+        "close": close,
+        "open": fields["Open"],
+        "high": fields["High"],
+        "low": fields["Low"],
+        "sma20": _scatter_back(sma(c, 20), order),
+        "sma200": _scatter_back(sma(c, 200), order),
+        "rsi": _scatter_back(rsi(c, 14), order),
+        "vol_ratio": _scatter_back(vol_ratio, order),
+        "pct_1m": _scatter_back(pct_1m, order),
+        "bars": _scatter_back(bars.astype(float), order),
+        "mcap": None if mcaps is None else np.array([mcaps.get(t) or np.nan for t in cols], dtype=float),
+    }
+    # Syarat: Harga > SMA20. Jika SMA200 tersedia, harus > SMA200.
+    p = prepared
+    with np.errstate(invalid="ignore"):
+        p["uptrend"] = valid & (p["bars"] >= MIN_BARS) & (close > p["sma20"]) & (
+            np.isnan(p["sma200"]) | (p["sma20"] > p["sma200"]))
+    return prepared
+
+
+def signals(p, rsi_min, vol_ratio_min, pct_1m_min, mcap_min=0.0):
+    """
+    Mask (T x N) hari/ticker yang lolos filter scan. Seperti app, ticker tanpa market
+    cap tidak lolos jika mcap_min > 0; tanpa p['mcap'] filter ini dilewati.
+    """
+    with np.errstate(invalid="ignore"):
+        mask = (p["uptrend"] & (p["rsi"] >= rsi_min) & (p["vol_ratio"] >= vol_ratio_min)
+                & (p["pct_1m"] >= pct_1m_min))
+        if mcap_min > 0 and p.get("mcap") is not None:
+            mask &= p["mcap"] / 1e12 >= mcap_min
+    return mask
+
+
+def trade_levels(price, sma20):
+    """SL/TP persis seperti di app: SL = SMA20 * 0.98, di luar 2-10% pakai 5%; TP 1:2."""
+    sl_price = sma20 * 0.98
+    risk_frac = (price - sl_price) / price
+    sl_price = np.where((risk_frac < 0.02) | (risk_frac > 0.10), price * 0.95, sl_price)
+    risk_per_sh = price - sl_price
+    return sl_price, price + risk_per_sh * 2, risk_per_sh
+
+
+def size_lots(price, risk_per_sh, total_budget, risk_per_trade):
+    """Kalkulasi lot (1 lot = 100 lembar) seperti di app."""
+    amt_to_risk = total_budget * (risk_per_trade / 100)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        lots = np.where(risk_per_sh > 0, np.floor(amt_to_risk / risk_per_sh / 100), 0)
+    # Proteksi: Total beli tidak boleh > modal
+    return np.where(lots * 100 * price > total_budget, np.floor(total_budget / (100 * price)), lots)
+
+
+def run_backtest(p, params=None):
+    """
+    Simulasi portofolio harian. Entry di close hari sinyal (harga yang disarankan app),
+    exit mulai hari berikutnya: SL jika Low <= SL (gap turun = harga Open), TP jika
+    High >= TP (gap naik = harga Open), SL didahulukan jika keduanya kena di hari yang
+    sama, atau close setelah `max_hold` hari. Modal terbatas `total_budget`: sinyal
+    diambil berurutan dari Vol Ratio tertinggi selama kas cukup.
+    Mengembalikan (ringkasan dict, DataFrame trade, Series equity).
+    """
+    params = dict(DEFAULT_PARAMS, **(params or {}))
+    if p.get("mcap") is None:
+        params["mcap_min"] = 0.0   # Tanpa market cap filter tidak aktif; ringkasan harus jujur
+    close, high, low, opn = p["close"], p["high"], p["low"], p["open"]
+    sig = signals(p, params["rsi_min"], params["vol_ratio_min"], params["pct_1m_min"], params["mcap_min"])
+    n_days, n_tickers = close.shape
+
+    lots = np.zeros(n_tickers)
+    entry_px = np.full(n_tickers, np.nan)
+    sl = np.full(n_tickers, np.nan)
+    tp = np.full(n_tickers, np.nan)
+    risk = np.full(n_tickers, np.nan)
+    entry_day = np.zeros(n_tickers, dtype=int)
+    last_px = np.full(n_tickers, np.nan)
+
+    cash = float(params["total_budget"])
+    traded_value = 0.0
+    equity = np.empty(n_days)
+    trades = []
+
+    for t in range(n_days):
+        has_bar = ~np.isnan(close[t])
+        last_px = np.where(has_bar, close[t], last_px)
+        held = lots > 0
+
+        # --- Exit ---
+        active = held & has_bar & (entry_day < t)
+        hit_sl = active & (low[t] <= sl)
+        hit_tp = active & ~hit_sl & (high[t] >= tp)
+        expired = active & ~hit_sl & ~hit_tp & (t - entry_day >= params["max_hold"])
+        exit_px = np.where(hit_sl, np.minimum(np.nan_to_num(opn[t], nan=np.inf), sl),
+                  np.where(hit_tp, np.maximum(np.nan_to_num(opn[t], nan=-np.inf), tp), close[t]))
+        exiting = hit_sl | hit_tp | expired
+        if exiting.any():
+            idx = np.flatnonzero(exiting)
+            shares = lots[idx] * 100
+            proceeds = shares * exit_px[idx] * (1 - params["fee_sell"])
+            cost = shares * entry_px[idx] * (1 + params["fee_buy"])
+            cash += proceeds.sum()
+            traded_value += (shares * exit_px[idx]).sum()
+            reason = np.where(hit_sl[idx], "SL", np.where(hit_tp[idx], "TP", "Time"))
+            for k, i in enumerate(idx):
+                trades.append((p["tickers"][i], p["dates"][entry_day[i]], p["dates"][t], entry_px[i],
+                               exit_px[i], int(lots[i]), proceeds[k] - cost[k],
+                               (exit_px[i] - entry_px[i]) / risk[i], reason[k]))
+            lots[idx] = 0
+
+        # --- Entry ---
+        candidates = np.flatnonzero(sig[t] & (lots == 0))
+        if candidates.size:
+            price = close[t, candidates]
+            c_sl, c_tp, c_risk = trade_levels(price, p["sma20"][t, candidates])
+            c_lots = size_lots(price, c_risk, params["total_budget"], params["risk_per_trade"])
+            cost = c_lots * 100 * price * (1 + params["fee_buy"])
+            priority = np.argsort(-p["vol_ratio"][t, candidates], kind="stable")
+            ok = (c_lots[priority] > 0) & (np.cumsum(np.where(c_lots[priority] > 0, cost[priority], 0)) <= cash)
+            take = priority[ok]
+            if take.size:
+                idx = candidates[take]
+                lots[idx] = c_lots[take]
+                entry_px[idx], sl[idx], tp[idx], risk[idx] = price[take], c_sl[take], c_tp[take], c_risk[take]
+                entry_day[idx] = t
+                cash -= cost[take].sum()
+                traded_value += (c_lots[take] * 100 * price[take]).sum()
+
+        equity[t] = cash + np.nansum(lots * 100 * last_px)
+
+    trades = pd.DataFrame(trades, columns=["Ticker", "Entry Date", "Exit Date", "Entry", "Exit",
+                                           "Lot", "PnL", "R", "Reason"])
+    equity = pd.Series(equity, index=p["dates"], name="Equity")
+    return summarize(trades, equity, traded_value, params), trades, equity
+
+
+def summarize(trades, equity, traded_value, params):
+    peak = equity.cummax()
+    years = max(len(equity) / 252, 1 / 252)
+    wins = trades["PnL"] > 0
+    return {
+        **{k: params[k] for k in ("rsi_min", "vol_ratio_min", "pct_1m_min", "mcap_min", "risk_per_trade",
+                                  "max_hold")},
+        "trades": len(trades),
+        "win_rate": float(wins.mean() * 100) if len(trades) else np.nan,
+        "expectancy_rp": float(trades["PnL"].mean()) if len(trades) else np.nan,
+        "expectancy_r": float(trades["R"].mean()) if len(trades) else np.nan,
+        "total_return": float((equity.iloc[-1] / params["total_budget"] - 1) * 100),
+        "max_drawdown": float(((peak - equity) / peak).max() * 100),
+        "turnover": float(traded_value / equity.mean() / years),   # x per tahun
+    }
+
+
+# --- Sweep grid parameter paralel ---
+_PREPARED = None
+
+
+def _init_worker(prepared):
+    global _PREPARED
+    _PREPARED = prepared
+
+
+def _run_one(params):
+    return run_backtest(_PREPARED, params)[0]
+
+
+def param_grid(**choices):
+    """param_grid(rsi_min=[50, 53], vol_ratio_min=[1.5, 2.0]) -> list dict semua kombinasi."""
+    keys = list(choices)
+    return [dict(zip(keys, combo)) for combo in itertools.product(*(choices[k] for k in keys))]
+
+
+def sweep(prepared, grid, workers=None):
+    """Jalankan run_backtest untuk tiap set parameter di semua core. Mengembalikan DataFrame ringkasan."""
+    workers = workers or os.cpu_count()
+    if workers == 1 or len(grid) == 1:
+        rows = [run_backtest(prepared, params)[0] for params in grid]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(prepared,)) as pool:
+            rows = list(pool.map(_run_one, grid))
+    return pd.DataFrame(rows)
+
+
+def _parse_grid(items):
+    choices = {}
+    for item in items:
+        key, values = item.split("=", 1)
+        choices[key] = [float(v) for v in values.split(",")]
+    return choices
+
+
+def _parse_period(value):
+    from price_store import _period_start
+    try:
+        _period_start(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return value
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest IDX Swing Screener")
+    parser.add_argument("grid", nargs="*", help="Parameter grid, mis. rsi_min=50,53,60 vol_ratio_min=1.5,2")
+    parser.add_argument("--tickers", default="tickers.csv", help="CSV daftar ticker (kolom 'ticker')")
+    parser.add_argument("--period", default="5y", type=_parse_period,
+                        help="Panjang histori (period yfinance: 5y, 18mo, ytd, max, ...)")
+    parser.add_argument("--no-mcap", action="store_true",
+                        help="Abaikan filter mcap_min (tanpa ambil market cap)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default="backtest_results.csv")
+    args = parser.parse_args()
+
+    from fundamentals import FundamentalsCache
+    from pipeline import run_pipeline
+    from price_store import PriceStore
+
+    tickers = pd.read_csv(args.tickers)["ticker"].tolist()
+    store = PriceStore(root=os.path.join("data", f"prices_{args.period}"), period=args.period)
+    # Unduh lewat pipeline scan (batch adaptif + retry per ticker) supaya tidak kena throttle
+    _, report = run_pipeline(tickers, store)
+    print(report.summary())
+    mcaps = None
+    if not args.no_mcap:
+        mcaps = FundamentalsCache().market_caps(tickers)
+        known = sum(v is not None for v in mcaps.values())
+        print(f"Filter mcap_min memakai market cap hari ini untuk seluruh histori (perkiraan): "
+              f"{known}/{len(tickers)} ticker punya market cap")
+    else:
+        print("Filter mcap_min tidak dipakai (--no-mcap): hasil tidak sama dengan aturan app")
+    prepared = prepare(store.load_window(tickers), tickers, mcaps)
+    results = sweep(prepared, param_grid(**_parse_grid(args.grid)), args.workers)
+    results = results.sort_values("expectancy_r", ascending=False)
+    results.to_csv(args.out, index=False)
+    print(results.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Benchmark scan end-to-end dengan pasar sintetis deterministik (fake_source.py),
+# tanpa internet. Tiap ukuran universe dijalankan di proses baru supaya peak memory
+# tidak tercampur: "cold" (store kosong, unduh penuh) lalu "warm" (store terisi,
+# unduh inkremental + fundamentals dari cache). Hasil ditambahkan ke file JSON lines
+# beserta commit git, jadi regresi bisa dibandingkan antar commit.
+
+DEFAULT_SIZES = [100, 1_000, 10_000]
+DEFAULT_OUT = "bench_results.jsonl"
+RUNS = ("cold", "warm")
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:   # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (2 ** 20 if sys.platform == "darwin" else 2 ** 10), 1)
+
+
+def git_commit():
+    """Commit HEAD repo ini (pendek), ditandai '+dirty' jika ada perubahan belum di-commit."""
+    repo = os.path.dirname(os.path.abspath(__file__))   # Bukan cwd: bench bisa dijalankan dari mana saja
+    try:
+        head = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True, cwd=repo).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                               capture_output=True, text=True, check=True, cwd=repo).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return head + ("+dirty" if dirty else "")
+
+
+def run_case(size, run, workdir, days=260, seed=0, latency=0.0, per_ticker_latency=0.0):
+    """Satu scan (dijalankan di proses anak). Data sintetis dibuat sebelum timer mulai."""
+    from fake_source import FakeSource, synthetic_market
+    from fundamentals import FundamentalsCache
+    from price_store import PriceStore
+    from screener import run_scan
+
+    os.chdir(workdir)   # run_scan menulis data/latest_scan.pkl & metrics relatif ke cwd
+    market = synthetic_market(size, days, seed=seed)
+    source = FakeSource(market, latency=latency, per_ticker_latency=per_ticker_latency, seed=seed)
+    source_rss = _peak_rss_mb()
+    store = PriceStore(root=os.path.join("data", "prices"), download=source.download)
+    fundamentals = FundamentalsCache(path=os.path.join("data", "fundamentals.json"), fetch_info=source.info)
+
+    start = time.perf_counter()
+    snapshot, results = run_scan(list(market), store, fundamentals)
+    seconds = time.perf_counter() - start
+    report = snapshot.attrs["report"]
+    return {
+        "size": size,
+        "run": run,
+        "seconds": round(seconds, 3),
+        "throughput": round(size / seconds, 1),
+        "stages": {k: round(v, 3) for k, v in report.stages.items()},
+        "counts": report.counts,
+        "batches": len(report.batches),
+        "downloads": len(source.calls),
+        "signals": len(results),
+        "source_rss_mb": source_rss,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def run_benchmark(sizes=DEFAULT_SIZES, runs=RUNS, days=260, seed=0, latency=0.0,
+                  per_ticker_latency=0.0, keep=False):
+    """Jalankan semua kasus; workdir per ukuran dipakai bersama oleh run cold -> warm."""
+    rows = []
+    for size in sizes:
+        workdir = tempfile.mkdtemp(prefix=f"idx_bench_{size}_")
+        try:
+            for run in runs:
+                with ProcessPoolExecutor(max_workers=1) as pool:
+                    row = pool.submit(run_case, size, run, workdir, days, seed,
+                                      latency, per_ticker_latency).result()
+                print(format_row(row), flush=True)
+                rows.append(row)
+        finally:
+            if not keep:
+                shutil.rmtree(workdir, ignore_errors=True)
+    return rows
+
+
+def format_row(row, previous=None):
+    line = (f"{row['size']:>6} {row['run']:<5} {row['seconds']:8.2f}s "
+            f"{row['throughput']:9.1f} ticker/s  peak {row['peak_rss_mb']} MB  | "
+            + " ".join(f"{k}={v:.2f}" for k, v in row["stages"].items()))
+    if previous:
+        change = (row["seconds"] / previous["seconds"] - 1) * 100
+        line += f"  | {change:+.1f}% vs {previous['commit']}"
+    return line
+
+
+def load_results(path):
+    try:
+        with open(path) as f:
+            return [json.loads(line) for line in f if line.strip()]
+    except OSError:
+        return []
+
+
+def compare(rows, history):
+    """Cetak tiap hasil beserta perubahan waktu terhadap hasil terakhir dari commit lain."""
+    for row in rows:
+        previous = next((h for h in reversed(history)
+                         if (h["size"], h["run"], h["days"]) == (row["size"], row["run"], row["days"])
+                         and h["commit"] != row["commit"]), None)
+        print(format_row(row, previous))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark scan IDX Swing Screener (data sintetis, offline)")
+    parser.add_argument("--sizes", type=lambda s: [int(x) for x in s.split(",")], default=DEFAULT_SIZES,
+                        help="Jumlah ticker dipisah koma (default 100,1000,10000)")
+    parser.add_argument("--runs", type=lambda s: s.split(","), default=list(RUNS), help="cold,warm")
+    parser.add_argument("--days", type=int, default=260, help="Panjang histori per ticker (hari bursa)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulasi latency per panggilan (detik)")
+    parser.add_argument("--per-ticker-latency", type=float, default=0.0)
+    parser.add_argument("--out", default=DEFAULT_OUT, help="File JSON lines hasil (ditambahkan)")
+    parser.add_argument("--keep", action="store_true", help="Jangan hapus direktori kerja sementara")
+    args = parser.parse_args()
+
+    out = os.path.abspath(args.out)
+    history = load_results(out)
+    meta = {"commit": git_commit(), "ts": round(time.time()), "python": platform.python_version(),
+            "machine": platform.machine(), "cpus": os.cpu_count(), "days": args.days, "seed": args.seed,
+            "latency": args.latency, "per_ticker_latency": args.per_ticker_latency}
+
+    rows = [dict(meta, **row) for row in run_benchmark(args.sizes, args.runs, args.days, args.seed,
+                                                        args.latency, args.per_ticker_latency, args.keep)]
+    with open(out, "a") as f:
+        for row in rows:
+            f.write(json.dumps(row) + "\n")
+    print(f"\nHasil ditambahkan ke {out}")
+    if meta["commit"] is None:
+        print("Peringatan: commit git tidak terbaca, hasil tidak bisa dibandingkan antar commit", file=sys.stderr)
+    compare(rows, history)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+
+from fundamentals import FundamentalsCache
+from instrumentation import profiled
+from notifier import TelegramNotifier, telegram_credentials_from_env
+from price_store import PriceStore
+from screener import DEFAULT_FILTERS, WIB, run_scan
+from universe import MIN_DAILY_VALUE, UniverseIndex, load_universe
+
+# Scan headless tanpa Streamlit: sekali jalan (`python cli.py scan`) atau terjadwal
+# (`python cli.py schedule`) untuk cron/systemd. Hasil disimpan ke data/latest_scan.pkl
+# dan langsung tampil di app Streamlit.
+
+DEFAULT_TIMES = ["09:15", "11:30", "15:50"]   # WIB
+
+
+def read_holidays(path):
+    """Tanggal libur bursa dari file teks (satu YYYY-MM-DD per baris)."""
+    if not path:
+        return set()
+    with open(path) as f:
+        return {line.strip() for line in f if line.strip() and not line.startswith("#")}
+
+
+def is_trading_day(day, holidays=()):
+    return day.weekday() < 5 and day.strftime("%Y-%m-%d") not in holidays
+
+
+def next_run(now, times, holidays=()):
+    """Jadwal berikutnya (datetime WIB) setelah `now` pada hari bursa."""
+    now = now.astimezone(WIB)
+    slots = sorted(datetime.strptime(t, "%H:%M").time() for t in times)
+    day = now.date()
+    for _ in range(366):
+        if is_trading_day(day, holidays):
+            for slot in slots:
+                candidate = datetime.combine(day, slot, tzinfo=WIB)
+                if candidate > now:
+                    return candidate
+        day += timedelta(days=1)
+    raise ValueError("Tidak ada hari bursa dalam setahun ke depan")
+
+
+def make_notifier(args):
+    if not args.telegram:
+        return None
+    token, chat_id = telegram_credentials_from_env()
+    if not token or not chat_id:
+        print("TELEGRAM_BOT_TOKEN / TELEGRAM_CHAT_ID belum di-set, pesan tidak dikirim", file=sys.stderr)
+        return None
+    return TelegramNotifier(token, chat_id)
+
+
+def scan_once(args, notifier=None):
+    tickers = load_universe(args.universe)
+    filters = {k: getattr(args, k) for k in DEFAULT_FILTERS}
+
+    def progress(fraction, text):
+        if args.verbose:
+            print(f"[{fraction:5.0%}] {text}", file=sys.stderr)
+
+    universe = None if args.no_prune else UniverseIndex(min_value=args.min_value)
+    with profiled(args.profile):
+        snapshot, results = run_scan(tickers, PriceStore(), FundamentalsCache(), filters, progress,
+                                     universe=universe, publish=False)
+    report = snapshot.attrs["report"]
+    print(f"{datetime.now(WIB):%Y-%m-%d %H:%M} WIB | {report.summary()} | {len(results)} sinyal")
+
+    if args.json:
+        print(json.dumps(results.to_dict(orient="records"), ensure_ascii=False))
+    elif len(results):
+        print(results.to_string(index=False))
+    if args.out:
+        results.to_csv(args.out, index=False)
+
+    notifier = notifier or make_notifier(args)
+    if notifier and len(results):
+        with report.stage("notify"):
+            fresh = notifier.notify(results.to_dict(orient="records"))
+            delivered = notifier.flush(args.telegram_timeout)
+        if not delivered:
+            print("Pengiriman Telegram belum selesai (timeout)", file=sys.stderr)
+        print(f"Telegram: {fresh} sinyal baru, {notifier.sent} pesan terkirim, {notifier.failed} gagal", file=sys.stderr)
+    try:
+        report.publish()
+    except OSError as e:
+        print(f"Gagal ekspor metrics scan: {e}", file=sys.stderr)
+    if args.verbose:
+        stages = " | ".join(f"{k}: {v:.2f}s" for k, v in report.stages.items())
+        print(f"Tahap: {stages}", file=sys.stderr)
+    return results
+
+
+def schedule(args):
+    holidays = read_holidays(args.holidays)
+    notifier = make_notifier(args)
+    while True:
+        run_at = next_run(datetime.now(WIB), args.times, holidays)
+        print(f"Scan berikutnya: {run_at:%a %Y-%m-%d %H:%M} WIB", flush=True)
+        while (remaining := (run_at - datetime.now(WIB)).total_seconds()) > 0:
+            time.sleep(min(remaining, 60))
+        try:
+            scan_once(args, notifier)
+        except Exception as e:
+            # Scheduler tetap hidup; scan berikutnya dicoba sesuai jadwal
+            print(f"Scan gagal: {e}", file=sys.stderr, flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="IDX Swing Screener - scan headless")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--universe", help="tickers.csv / Excel IDX; default daftar bawaan")
+    common.add_argument("--telegram", action="store_true", help="Kirim sinyal ke Telegram (env TELEGRAM_*)")
+    common.add_argument("--telegram-timeout", type=float, default=120,
+                        help="Batas tunggu antrian Telegram sebelum lanjut/keluar (detik)")
+    common.add_argument("--json", action="store_true", help="Cetak hasil sebagai JSON")
+    common.add_argument("--out", help="Simpan hasil ke CSV")
+    common.add_argument("--no-prune", action="store_true",
+                        help="Unduh semua ticker, termasuk yang tercatat mati / tidak likuid")
+    common.add_argument("--min-value", type=float, default=MIN_DAILY_VALUE,
+                        help="Rata-rata nilai transaksi harian minimum (Rupiah) sebelum ticker dilewati")
+    common.add_argument("--profile", help="Simpan profil cProfile scan ke file .prof (default env IDX_SCAN_PROFILE)")
+    common.add_argument("-v", "--verbose", action="store_true")
+    for key, value in DEFAULT_FILTERS.items():
+        common.add_argument(f"--{key.replace('_', '-')}", type=type(value), default=value)
+
+    sub.add_parser("scan", parents=[common], help="Jalankan satu scan sekarang")
+    sched = sub.add_parser("schedule", parents=[common], help="Scan terjadwal di hari bursa")
+    sched.add_argument("--times", type=lambda s: s.split(","), default=DEFAULT_TIMES,
+                       help="Jam WIB dipisah koma (default 09:15,11:30,15:50)")
+    sched.add_argument("--holidays", help="File tanggal libur bursa (YYYY-MM-DD per baris)")
+
+    args = parser.parse_args(argv)
+    if args.command == "scan":
+        scan_once(args)
+    else:
+        schedule(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import numpy as np
+import pandas as pd
+
+# Sumber data palsu lokal dengan bentuk yang sama seperti yf.download(group_by='ticker')
+# dan yf.Ticker(...).info, plus stand-in HTTP untuk Telegram Bot API. Dipakai untuk
+# menguji pipeline, notifier dan benchmark (bench.py) tanpa internet: latency dan
+# error bisa diinjeksi.
+
+SHORT_LISTING_DAYS = (5, 199)   # Rentang panjang data saham baru listing (< SMA200)
+
+
+def make_frame(ticker, days=260, end=None, seed=0, gap_rate=0.0, zero_volume_rate=0.0):
+    """
+    OHLCV random-walk deterministik per ticker. `gap_rate`: peluang satu bar kosong
+    (baris NaN seperti di hasil yf.download multi-ticker), `zero_volume_rate`: peluang
+    hari tanpa transaksi (Volume 0, harga sama dengan Close sebelumnya).
+    """
+    rng = np.random.default_rng(zlib.crc32(ticker.encode()) + seed)
+    index = pd.bdate_range(end=end or pd.Timestamp.today().normalize(), periods=days)
+    close = 1000 * np.exp(np.cumsum(rng.normal(0.0005, 0.02, days)))
+    spread = close * rng.uniform(0, 0.02, days)
+    df = pd.DataFrame({
+        "Open": close + rng.uniform(-1, 1, days) * spread,
+        "High": close + spread,
+        "Low": close - spread,
+        "Close": close,
+        "Volume": rng.integers(10_000, 5_000_000, days).astype(float),
+    }, index=pd.DatetimeIndex(index, name="Date"))
+
+    if zero_volume_rate:
+        idle = rng.random(days) < zero_volume_rate
+        idle[0] = False
+        flat = pd.Series(np.where(idle, np.nan, close)).ffill().to_numpy()
+        df.loc[idle, ["Open", "High", "Low", "Close"]] = flat[idle, None]
+        df.loc[idle, "Volume"] = 0.0
+    if gap_rate:
+        df.loc[rng.random(days) < gap_rate] = np.nan
+    return df
+
+
+def market_cap(ticker, seed=0):
+    """Market cap deterministik (Rupiah), sebaran log-uniform 50 M - 500 T."""
+    rng = np.random.default_rng(zlib.crc32(ticker.encode()) + seed + 1)
+    return float(10 ** rng.uniform(10.7, 14.7))
+
+
+def synthetic_market(n, days=260, end=None, seed=0, short_rate=0.05, gap_rate=0.01,
+                     zero_volume_rate=0.02):
+    """
+    `n` ticker sintetis (SYN00000.JK, ...) -> DataFrame OHLCV. Sebagian (`short_rate`)
+    adalah saham baru listing dengan data lebih pendek dari SMA200.
+    """
+    rng = np.random.default_rng(seed)
+    lengths = np.where(rng.random(n) < short_rate, rng.integers(*SHORT_LISTING_DAYS, n), days)
+    return {
+        f"SYN{i:05d}.JK": make_frame(f"SYN{i:05d}.JK", int(length), end, seed, gap_rate, zero_volume_rate)
+        for i, length in enumerate(lengths)
+    }
+
+
+class FakeTicker:
+    """Pengganti yf.Ticker: hanya atribut `info` yang dipakai app."""
+
+    def __init__(self, source, ticker):
+        self._source = source
+        self.ticker = ticker
+
+    @property
+    def info(self):
+        return self._source.info(self.ticker)
+
+
+class FakeSource:
+    """
+    Pengganti modul yfinance: dipanggil langsung / `.download(...)` seperti yf.download,
+    `.Ticker(t).info` seperti yf.Ticker. Parameter uji:
+    - latency / per_ticker_latency: jeda (detik) per panggilan dan per ticker
+    - error_rate: peluang satu panggilan melempar error
+    - max_batch: panggilan dengan ticker lebih banyak dari ini selalu error (simulasi throttle)
+    - dead: ticker yang selalu kosong (delisting/suspensi)
+    """
+
+    def __init__(self, frames=None, latency=0.0, per_ticker_latency=0.0, error_rate=0.0,
+                 max_batch=None, dead=(), days=260, seed=0):
+        self.frames = dict(frames or {})
+        self.latency = latency
+        self.per_ticker_latency = per_ticker_latency
+        self.error_rate = error_rate
+        self.max_batch = max_batch
+        self.dead = set(dead)
+        self.days = days
+        self.seed = seed
+        self.calls = []
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def frame(self, ticker):
+        if ticker not in self.frames:
+            self.frames[ticker] = make_frame(ticker, self.days, seed=self.seed)
+        return self.frames[ticker]
+
+    def __call__(self, tickers, start=None, period=None, **kwargs):
+        tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+        with self._lock:
+            self.calls.append((len(tickers), start, period))
+            unlucky = self._rng.random() < self.error_rate
+        time.sleep(self.latency + self.per_ticker_latency * len(tickers))
+        if unlucky or (self.max_batch and len(tickers) > self.max_batch):
+            raise ConnectionError("Fake throttle: Too Many Requests")
+
+        frames = {}
+        for ticker in tickers:
+            if ticker in self.dead:
+                continue
+            with self._lock:
+                df = self.frame(ticker)
+            if start is not None:
+                df = df[df.index >= pd.Timestamp(start)]
+            if len(df):
+                frames[ticker] = df
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, axis=1)
+
+    download = __call__
+
+    def Ticker(self, ticker):
+        return FakeTicker(self, ticker)
+
+    def info(self, ticker):
+        time.sleep(self.latency)
+        if ticker in self.dead:
+            return {}
+        return {"symbol": ticker, "marketCap": market_cap(ticker, self.seed), "currency": "IDR"}
+
+
+class FakeTelegramAPI:
+    """
+    Stand-in HTTP lokal untuk Telegram Bot API (hanya sendMessage). Pesan diterima
+    disimpan di `messages`. Parameter uji:
+    - rate_limit: minimal detik antar pesan per chat; lebih cepat dibalas 429 + retry_after
+    - fail_first: jumlah request pertama yang dibalas 500
+    Pakai sebagai context manager; `url` untuk TelegramNotifier(api=...) / env TELEGRAM_API_URL.
+    """
+
+    def __init__(self, rate_limit=0.0, retry_after=1, fail_first=0, max_chars=4096):
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.fail_first = fail_first
+        self.max_chars = max_chars
+        self.messages = []
+        self.requests = 0
+        self._last = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.url = f"http://127.0.0.1:{self._server.server_port}"
+
+    def __enter__(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _reply(self, form):
+        chat_id, text = form.get("chat_id", [""])[0], form.get("text", [""])[0]
+        with self._lock:
+            self.requests += 1
+            if self.requests <= self.fail_first:
+                return 500, {"ok": False, "error_code": 500, "description": "Internal Server Error"}
+            now = time.monotonic()
+            if now - self._last.get(chat_id, -1e9) < self.rate_limit:
+                return 429, {"ok": False, "error_code": 429, "description": "Too Many Requests",
+                             "parameters": {"retry_after": self.retry_after}}
+            if not text or len(text) > self.max_chars:
+                return 400, {"ok": False, "error_code": 400, "description": "Bad Request: message is too long"}
+            self._last[chat_id] = now
+            self.messages.append({"chat_id": chat_id, "text": text})
+            return 200, {"ok": True, "result": {"message_id": len(self.messages)}}
+
+    def _handler(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode()
+                if self.path.endswith("/sendMessage"):
+                    status, payload = api._reply(parse_qs(body))
+                else:
+                    status, payload = 404, {"ok": False, "error_code": 404, "description": "Not Found"}
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
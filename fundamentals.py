@@ -0,0 +1,102 @@
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from price_store import _atomic_json
+
+# Cache data fundamental (market cap) di disk dengan TTL. Market cap jarang berubah,
+# jadi satu hari cukup; pengisian dilakukan paralel dengan retry + backoff.
+
+DEFAULT_PATH = os.path.join("data", "fundamentals.json")
+DEFAULT_TTL = 24 * 60 * 60   # detik
+MAX_WORKERS = 8
+MAX_RETRIES = 3
+BACKOFF_BASE = 1.0           # detik, dikali 2 tiap percobaan ulang
+
+
+def _yf_info(ticker):
+    import yfinance as yf
+    return yf.Ticker(ticker).info
+
+
+class FundamentalsCache:
+    """Market cap per ticker, dipersist ke JSON dan diisi oleh worker pool terbatas."""
+
+    def __init__(self, path=DEFAULT_PATH, ttl=DEFAULT_TTL, max_workers=MAX_WORKERS,
+                 retries=MAX_RETRIES, backoff=BACKOFF_BASE, fetch_info=None):
+        self.path = path
+        self.ttl = ttl
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.fetch_info = fetch_info or _yf_info
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        # Lock ditahan sampai replace: refresh() di background (warm) dan market_caps()
+        # milik scan bisa menyimpan bersamaan; file sementara unik juga aman antar proses
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._lock:
+            _atomic_json(self.path, self._entries)
+
+    def get(self, ticker, now=None):
+        """Entry yang masih segar ({'marketCap': ..., 'ts': ...}) atau None."""
+        now = now or time.time()
+        with self._lock:
+            entry = self._entries.get(ticker)
+        if entry and now - entry["ts"] < self.ttl:
+            return entry
+        return None
+
+    def _fetch_one(self, ticker):
+        for attempt in range(self.retries + 1):
+            try:
+                info = self.fetch_info(ticker) or {}
+                return {"marketCap": info.get("marketCap") or 0, "ts": time.time()}
+            except Exception:
+                if attempt == self.retries:
+                    return None
+                # Exponential backoff + jitter supaya worker tidak serempak kena throttle
+                time.sleep(self.backoff * (2 ** attempt) * (0.5 + random.random()))
+
+    def refresh(self, tickers, force=False):
+        """Ambil ulang ticker yang belum ada / kadaluarsa secara paralel. Mengembalikan ticker yang gagal."""
+        todo = [t for t in dict.fromkeys(tickers) if force or self.get(t) is None]
+        if not todo:
+            return []
+        failed = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for ticker, entry in zip(todo, pool.map(self._fetch_one, todo)):
+                if entry is None:
+                    failed.append(ticker)
+                    continue
+                with self._lock:
+                    self._entries[ticker] = entry
+        self.save()
+        return failed
+
+    def market_caps(self, tickers):
+        """Dict ticker -> market cap (IDR); None jika gagal diambil."""
+        self.refresh(tickers)
+        caps = {}
+        for ticker in tickers:
+            entry = self.get(ticker)
+            caps[ticker] = entry["marketCap"] if entry else None
+        return caps
+
+    def warm(self, tickers):
+        """Isi cache seluruh universe di background thread."""
+        thread = threading.Thread(target=self.refresh, args=(list(tickers),), daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,160 @@
+import numpy as np
+import pandas as pd
+
+# Mesin indikator vektor: semua ticker dihitung sekaligus dalam array 2D (tanggal x ticker),
+# menggantikan loop pandas_ta per ticker. Hasilnya sama dengan pandas_ta
+# (ta.sma / ta.rsi) dalam batas TOLERANCE.
+
+TOLERANCE = 1e-6   # Selisih absolut maksimum vs pandas_ta (harga, RSI, rasio, persen)
+MIN_BARS = 20      # Minimal data untuk SMA20
+METRIC_COLUMNS = ["Price", "SMA20", "SMA200", "RSI", "Vol Ratio", "Pct 1M", "Bars"]
+
+
+def panel(data, field, tickers=None):
+    """Ambil satu field dari data MultiIndex (ticker, field) sebagai DataFrame tanggal x ticker."""
+    if not isinstance(data.columns, pd.MultiIndex):
+        return pd.DataFrame({tickers[0]: data[field]}) if tickers else data[[field]]
+    if field not in data.columns.get_level_values(1):
+        return pd.DataFrame(index=data.index)
+    frame = data.xs(field, axis=1, level=1)
+    if tickers is not None:
+        frame = frame.reindex(columns=[t for t in tickers if t in frame.columns])
+    return frame.astype(float)
+
+
+def align_right(close, *others):
+    """
+    Geser bar valid (Close tidak NaN) tiap kolom ke bawah, NaN ke atas. Setara dengan
+    df.dropna(subset=['Close']) per ticker: bar terakhir semua ticker ada di baris terakhir.
+    `others` (mis. Volume) ikut dipindah dengan urutan yang sama.
+    """
+    valid = ~np.isnan(close)
+    order = np.argsort(valid, axis=0, kind="stable")
+    out = [np.take_along_axis(close, order, axis=0)]
+    out += [np.take_along_axis(arr, order, axis=0) for arr in others]
+    return out, valid.sum(axis=0)
+
+
+def sma(values, length):
+    """SMA rolling per kolom; NaN sampai window penuh (sama dengan ta.sma)."""
+    valid = ~np.isnan(values)
+    csum = np.cumsum(np.where(valid, values, 0.0), axis=0)
+    ccount = np.cumsum(valid, axis=0)
+    out = np.full(values.shape, np.nan)
+    if len(values) < length:
+        return out
+    window_sum = csum[length - 1:].copy()
+    window_sum[1:] -= csum[:-length]
+    window_count = ccount[length - 1:].copy()
+    window_count[1:] -= ccount[:-length]
+    out[length - 1:] = np.where(window_count == length, window_sum / length, np.nan)
+    return out
+
+
+def rsi(values, length=14):
+    """
+    RSI Wilder per kolom. Sama dengan ta.rsi: rata-rata gain/loss memakai
+    ewm(alpha=1/length, adjust=True, min_periods=length) di atas diff harga.
+    Hanya mendukung NaN di awal kolom (pakai align_right lebih dulu).
+    """
+    diff = np.full(values.shape, np.nan)
+    diff[1:] = values[1:] - values[:-1]
+    valid = ~np.isnan(diff)
+    gain = np.where(valid, np.maximum(diff, 0.0), 0.0)
+    loss = np.where(valid, np.maximum(-diff, 0.0), 0.0)
+
+    # Bobot ewm adjust=True sama untuk gain dan loss, jadi cukup simpan pembilangnya
+    decay = 1.0 - 1.0 / length
+    n_cols = values.shape[1]
+    num_gain, num_loss = np.zeros(n_cols), np.zeros(n_cols)
+    count = np.zeros(n_cols)
+    out = np.full(values.shape, np.nan)
+    for t in range(values.shape[0]):
+        num_gain = decay * num_gain + gain[t]
+        num_loss = decay * num_loss + loss[t]
+        count += valid[t]
+        total = num_gain + num_loss
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out[t] = np.where((count >= length) & (total > 0), 100.0 * num_gain / total, np.nan)
+    return out
+
+
+def compute_metrics(data, tickers=None, min_bars=MIN_BARS):
+    """
+    Hitung metrik scan untuk seluruh universe dalam beberapa pass NumPy.
+    Mengembalikan DataFrame index=Ticker, kolom METRIC_COLUMNS, hanya untuk
+    ticker dengan minimal `min_bars` bar. SMA200 = NaN jika data < 200 bar
+    (sebelumnya diisi 0 lewat fillna).
+    """
+    close_df = panel(data, "Close", tickers)
+    if close_df.empty:
+        return pd.DataFrame(columns=METRIC_COLUMNS, index=pd.Index([], name="Ticker"))
+    volume_df = panel(data, "Volume", list(close_df.columns)).reindex(columns=close_df.columns)
+
+    (close, volume), bars = align_right(close_df.to_numpy(), volume_df.to_numpy())
+    volume = np.nan_to_num(volume, nan=0.0)
+    n_rows = close.shape[0]
+    cols = np.arange(close.shape[1])
+
+    price = close[-1]
+    sma20 = sma(close[-20:], 20)[-1] if n_rows >= 20 else np.full(len(cols), np.nan)
+    sma200 = sma(close[-200:], 200)[-1] if n_rows >= 200 else np.full(len(cols), np.nan)
+    rsi14 = rsi(close, 14)[-1]
+
+    # Rata-rata volume 20 bar terakhir (atau semua bar jika lebih sedikit)
+    window = np.minimum(bars, 20)
+    rows = np.arange(n_rows)[:, None]
+    in_window = rows >= (n_rows - window)
+    avg_vol = np.where(in_window, volume, 0.0).sum(axis=0) / np.maximum(window, 1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        vol_ratio = np.where(avg_vol > 0, volume[-1] / avg_vol, 0.0)
+
+    # % change 1 bulan: 21 bar ke belakang, atau bar pertama jika data lebih pendek
+    prev_row = np.where(bars >= 21, n_rows - 21, n_rows - bars).clip(0, n_rows - 1)
+    prev_close = close[prev_row, cols]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        pct_1m = (price - prev_close) / prev_close * 100
+
+    metrics = pd.DataFrame({
+        "Price": price,
+        "SMA20": sma20,
+        "SMA200": sma200,
+        "RSI": rsi14,
+        "Vol Ratio": vol_ratio,
+        "Pct 1M": pct_1m,
+        "Bars": bars,
+    }, index=pd.Index(close_df.columns, name="Ticker"))
+    return metrics[metrics["Bars"] >= min_bars]
+
+
+def compare_with_pandas_ta(data, tickers=None):
+    """
+    Jalankan perhitungan lama (loop pandas_ta per ticker) dan bandingkan dengan
+    compute_metrics. Mengembalikan selisih absolut maksimum per kolom; semua
+    harus <= TOLERANCE.
+    """
+    import pandas_ta as ta
+
+    fast = compute_metrics(data, tickers)
+    diffs = {}
+    for ticker, row in fast.iterrows():
+        df = data[ticker].dropna(subset=["Close"]).copy()
+        df["SMA20"] = ta.sma(df["Close"], length=20)
+        df["SMA200"] = ta.sma(df["Close"], length=200)
+        df["RSI"] = ta.rsi(df["Close"], length=14)
+        df = df.fillna(0)
+        last = df.iloc[-1]
+        avg_vol = float(df["Volume"].tail(20).mean())
+        prev_1m = df.iloc[-21] if len(df) >= 21 else df.iloc[0]
+        reference = {
+            "Price": float(last["Close"]),
+            "SMA20": float(last["SMA20"]),
+            "SMA200": float(last["SMA200"]),
+            "RSI": float(last["RSI"]),
+            "Vol Ratio": float(last["Volume"]) / avg_vol if avg_vol > 0 else 0,
+            "Pct 1M": (float(last["Close"]) - float(prev_1m["Close"])) / float(prev_1m["Close"]) * 100,
+        }
+        for col, ref in reference.items():
+            value = 0.0 if np.isnan(row[col]) else row[col]  # NaN baru = 0 versi lama
+            diffs[col] = max(diffs.get(col, 0.0), abs(value - ref))
+    return diffs
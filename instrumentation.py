@@ -0,0 +1,162 @@
+import cProfile
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+from indicators import MIN_BARS
+from price_store import _atomic_write
+
+# Instrumentasi scan: waktu per tahap & per batch, jumlah outcome per ticker,
+# hit rate cache, dan ekspor ke JSON lines / format teks Prometheus.
+
+METRICS_JSONL = os.path.join("data", "scan_metrics.jsonl")
+METRICS_PROM = os.path.join("data", "scan_metrics.prom")
+PROFILE_ENV = "IDX_SCAN_PROFILE"   # Path file .prof; jika di-set, scan di-profile dengan cProfile
+
+
+class ScanReport:
+    """
+    Rekap satu scan. Outcome per ticker:
+    ok (lolos download + indikator), stale (unduhan kosong, metrik dari bar lama di store),
+    no_data, too_short, failed (error download),
+    skipped (dilewati karena mati / suspensi / tidak likuid menurut UniverseIndex),
+    lalu setelah filter: hit, filtered (tidak lolos filter), fundamentals_failed.
+    """
+
+    PIPELINE_OUTCOMES = ("ok", "stale", "no_data", "too_short", "failed", "skipped")
+    SCREEN_OUTCOMES = ("hit", "filtered", "fundamentals_failed")   # Hanya jika filter diketahui (run_scan)
+
+    def __init__(self, total):
+        self.total = total
+        self.started_at = time.time()
+        self.counts = dict.fromkeys(self.PIPELINE_OUTCOMES, 0)
+        self.retried = 0
+        self.failed = {}       # ticker -> pesan error terakhir
+        self.skipped = {}      # ticker -> alasan dilewati (dead / suspended / illiquid)
+        self.batches = []      # dict per batch: size, download, compute (detik), failed
+        self.stages = {}       # nama tahap -> detik; 'download' = total waktu worker (overlap dengan compute)
+        self.caches = {}       # nama cache -> [hit, miss]
+        self.elapsed = 0.0
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+    def cache(self, name, hits, misses):
+        with self._lock:
+            counts = self.caches.setdefault(name, [0, 0])
+            counts[0] += hits
+            counts[1] += misses
+
+    def hit_rate(self, name):
+        hits, misses = self.caches.get(name, (0, 0))
+        return hits / (hits + misses) if hits + misses else None
+
+    def screen_counts(self, snapshot, hit_mask):
+        """Outcome setelah filter untuk `hit_mask` (mask ticker lolos di snapshot)."""
+        hits = int(hit_mask.sum())
+        fundamentals_failed = int((snapshot["Uptrend"] & snapshot["MCap"].isna()).sum())
+        return {"hit": hits, "fundamentals_failed": fundamentals_failed,
+                "filtered": len(snapshot) - hits - fundamentals_failed}
+
+    def summary(self):
+        c = self.counts
+        return (f"{c['ok']}/{self.total} OK | data lama: {c.get('stale', 0)} | tanpa data: {c['no_data']} | "
+                f"data < {MIN_BARS} bar: {c['too_short']} | gagal: {c['failed']} "
+                f"(retry: {self.retried}) | dilewati: {c.get('skipped', 0)} | "
+                f"{len(self.batches)} batch, {self.elapsed:.1f} detik")
+
+    # --- Ekspor ---
+    def to_dict(self):
+        return {
+            "ts": round(self.started_at, 3),
+            "total": self.total,
+            "elapsed": round(self.elapsed, 3),
+            "counts": self.counts,
+            "retried": self.retried,
+            "stages": {k: round(v, 3) for k, v in self.stages.items()},
+            "caches": {k: {"hit": h, "miss": m} for k, (h, m) in self.caches.items()},
+            "batches": self.batches,
+            "failed": self.failed,
+            "skipped": getattr(self, "skipped", {}),
+        }
+
+    def to_prometheus(self):
+        lines = [
+            "# HELP idx_scan_duration_seconds Wall time scan terakhir.",
+            "# TYPE idx_scan_duration_seconds gauge",
+            f"idx_scan_duration_seconds {self.elapsed:.3f}",
+            "# HELP idx_scan_stage_seconds Detik per tahap scan terakhir (download = total waktu worker).",
+            "# TYPE idx_scan_stage_seconds gauge",
+        ]
+        lines += [f'idx_scan_stage_seconds{{stage="{k}"}} {v:.3f}' for k, v in self.stages.items()]
+        lines += ["# HELP idx_scan_tickers Jumlah ticker per outcome pada scan terakhir.",
+                  "# TYPE idx_scan_tickers gauge"]
+        lines += [f'idx_scan_tickers{{outcome="{k}"}} {v}' for k, v in self.counts.items()]
+        lines += ["# HELP idx_scan_cache_requests Lookup cache per hasil pada scan terakhir.",
+                  "# TYPE idx_scan_cache_requests gauge"]
+        for name, (hits, misses) in self.caches.items():
+            lines.append(f'idx_scan_cache_requests{{cache="{name}",result="hit"}} {hits}')
+            lines.append(f'idx_scan_cache_requests{{cache="{name}",result="miss"}} {misses}')
+        lines += ["# HELP idx_scan_batches Jumlah batch download pada scan terakhir.",
+                  "# TYPE idx_scan_batches gauge",
+                  f"idx_scan_batches {len(self.batches)}",
+                  f"idx_scan_timestamp_seconds {self.started_at:.0f}"]
+        return "\n".join(lines) + "\n"
+
+    def publish(self, jsonl_path=METRICS_JSONL, prom_path=METRICS_PROM):
+        """Tambah satu baris JSON ke log dan tulis ulang file Prometheus (textfile collector)."""
+        for path in (jsonl_path, prom_path):
+            if path:
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if jsonl_path:
+            with open(jsonl_path, "a") as f:
+                f.write(json.dumps(self.to_dict(), ensure_ascii=False) + "\n")
+        if prom_path:
+            text = self.to_prometheus()
+
+            def write(tmp):
+                with open(tmp, "w") as f:
+                    f.write(text)
+            # File sementara unik: app dan scheduler CLI bisa mempublish bersamaan
+            _atomic_write(prom_path, write)
+
+
+@contextmanager
+def _profile(path):
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        profiler.dump_stats(path)
+
+
+def profiled(path=None):
+    """
+    Context manager cProfile untuk satu scan; `path` default dari env IDX_SCAN_PROFILE.
+    Tanpa path tidak melakukan apa-apa. Hanya thread pemanggil yang di-profile (compute);
+    waktu download di worker thread terlihat di ScanReport.stages. Buka hasilnya dengan
+    `python -m pstats <path>`.
+    """
+    path = path or os.environ.get(PROFILE_ENV)
+    return _profile(path) if path else nullcontext()
@@ -0,0 +1,338 @@
+import argparse
+import csv
+import math
+import time
+from datetime import datetime, time as dtime
+
+import numpy as np
+import pandas as pd
+
+from indicators import MIN_BARS, panel
+from screener import WIB
+
+# Mode real-time: state rolling per ticker (ring buffer SMA, rata-rata Wilder RSI,
+# jumlah volume berjalan). Tiap update harga/volume intraday O(1), jadi seluruh
+# universe IDX bisa dievaluasi ulang tiap beberapa detik selama jam bursa.
+
+RSI_LENGTH = 14
+RSI_DECAY = 1.0 - 1.0 / RSI_LENGTH
+MARKET_OPEN = dtime(9, 0)
+MARKET_CLOSE = dtime(16, 15)
+
+
+def is_market_open(now=None):
+    """Jam bursa IDX (WIB), Senin-Jumat. Tidak memperhitungkan hari libur bursa."""
+    now = (now or datetime.now(WIB)).astimezone(WIB)
+    return now.weekday() < 5 and MARKET_OPEN <= now.time() <= MARKET_CLOSE
+
+
+class RingBuffer:
+    """Buffer melingkar ukuran tetap; push() mengembalikan nilai yang tergeser keluar."""
+
+    __slots__ = ("values", "head", "size")
+
+    def __init__(self, capacity):
+        self.values = [0.0] * capacity
+        self.head = 0
+        self.size = 0
+
+    def push(self, value):
+        capacity = len(self.values)
+        evicted = self.values[self.head] if self.size == capacity else None
+        self.values[self.head] = value
+        self.head = (self.head + 1) % capacity
+        self.size = min(self.size + 1, capacity)
+        return evicted
+
+    def ago(self, k):
+        """Nilai ke-k dari yang terbaru (0 = terbaru)."""
+        return self.values[(self.head - 1 - k) % len(self.values)]
+
+
+class TickerState:
+    """
+    State indikator satu ticker. Bar harian yang sudah selesai di-commit ke ring buffer;
+    bar hari ini disimpan terpisah (harga terakhir + volume kumulatif) sehingga
+    metrik bisa dihitung ulang tiap tick tanpa mengubah state harian.
+    """
+
+    __slots__ = ("closes", "volumes", "sum19", "sum199", "vol_sum19", "gain", "loss",
+                 "diffs", "first_close", "completed", "day", "price", "day_volume")
+
+    def __init__(self):
+        self.closes = RingBuffer(200)
+        self.volumes = RingBuffer(19)
+        self.sum19 = self.sum199 = self.vol_sum19 = 0.0
+        self.gain = self.loss = 0.0    # Pembilang ewm gain/loss (bobot saling menghapus di RSI)
+        self.diffs = 0
+        self.first_close = None
+        self.completed = 0
+        self.day = None
+        self.price = None
+        self.day_volume = 0.0
+
+    def commit(self, close, volume):
+        """Tutup satu bar harian: O(1)."""
+        if self.completed:
+            diff = close - self.closes.ago(0)
+            self.gain = RSI_DECAY * self.gain + max(diff, 0.0)
+            self.loss = RSI_DECAY * self.loss + max(-diff, 0.0)
+            self.diffs += 1
+        else:
+            self.first_close = close
+        if self.closes.size >= 19:
+            self.sum19 -= self.closes.ago(18)
+        if self.closes.size >= 199:
+            self.sum199 -= self.closes.ago(198)
+        self.closes.push(close)
+        self.sum19 += close
+        self.sum199 += close
+        evicted = self.volumes.push(volume)
+        self.vol_sum19 += volume - (evicted or 0.0)
+        self.completed += 1
+
+    def update(self, day, price, day_volume):
+        """Tick intraday: harga terakhir + volume kumulatif hari `day`. Ganti hari = commit bar kemarin."""
+        if self.day is not None and day != self.day and self.price is not None:
+            self.commit(self.price, self.day_volume)
+            self.day_volume = 0.0
+        self.day = day
+        self.price = price
+        self.day_volume = day_volume
+
+    def metrics(self):
+        """Metrik dengan definisi yang sama dengan indicators.compute_metrics, dalam O(1)."""
+        p = self.price
+        n = self.completed
+        bars = n + 1
+        sma20 = (self.sum19 + p) / 20 if n >= 19 else math.nan
+        sma200 = (self.sum199 + p) / 200 if n >= 199 else math.nan
+
+        rsi = math.nan
+        if n and self.diffs + 1 >= RSI_LENGTH:
+            diff = p - self.closes.ago(0)
+            gain = RSI_DECAY * self.gain + max(diff, 0.0)
+            loss = RSI_DECAY * self.loss + max(-diff, 0.0)
+            if gain + loss > 0:
+                rsi = 100.0 * gain / (gain + loss)
+
+        avg_vol = (self.vol_sum19 + self.day_volume) / min(bars, 20)
+        vol_ratio = self.day_volume / avg_vol if avg_vol > 0 else 0.0
+
+        # 21 bar ke belakang (termasuk hari ini), atau bar pertama jika data lebih pendek
+        if n >= 20:
+            prev = self.closes.ago(19)
+        else:
+            prev = self.first_close if n else p
+        pct_1m = (p - prev) / prev * 100
+
+        return {"Price": p, "SMA20": sma20, "SMA200": sma200, "RSI": rsi,
+                "Vol Ratio": vol_ratio, "Pct 1M": pct_1m, "Bars": bars}
+
+
+class LiveScreener:
+    """
+    Screen real-time di atas TickerState. on_quotes() mengembalikan event untuk ticker
+    yang baru masuk ('enter') atau keluar ('exit') dari himpunan sinyal.
+    """
+
+    def __init__(self, rsi_min=53, vol_ratio_min=2.0, pct_1m_min=12, mcap_min=0.0, mcaps=None):
+        self.rsi_min = rsi_min
+        self.vol_ratio_min = vol_ratio_min
+        self.pct_1m_min = pct_1m_min
+        self.mcap_min = mcap_min
+        self.mcaps = mcaps or {}
+        self.states = {}
+        self.signals = set()
+
+    def seed(self, data, tickers=None):
+        """
+        Isi state dari histori harian (bentuk yf.download group_by='ticker').
+        Bar terakhir diperlakukan sebagai bar hari ini (bisa masih berjalan).
+        """
+        closes = panel(data, "Close", tickers)
+        volumes = panel(data, "Volume", list(closes.columns)).reindex(columns=closes.columns)
+        for ticker in closes.columns:
+            valid = closes[ticker].notna().to_numpy()
+            if not valid.any():
+                continue
+            c = closes[ticker].to_numpy()[valid]
+            v = np.nan_to_num(volumes[ticker].to_numpy()[valid], nan=0.0)
+            days = closes.index[valid]
+            state = TickerState()
+            for close, volume in zip(c[:-1], v[:-1]):
+                state.commit(float(close), float(volume))
+            state.update(days[-1].date(), float(c[-1]), float(v[-1]))
+            self.states[ticker] = state
+            if self.passes(ticker, state.metrics()):
+                self.signals.add(ticker)
+
+    def passes(self, ticker, m):
+        if m["Bars"] < MIN_BARS:
+            return False
+        # Syarat: Harga > SMA20. Jika SMA200 tersedia, harus > SMA200.
+        if math.isnan(m["SMA200"]):
+            uptrend = m["Price"] > m["SMA20"]
+        else:
+            uptrend = m["Price"] > m["SMA20"] > m["SMA200"]
+        mcap = self.mcaps.get(ticker)
+        if self.mcap_min > 0 and (mcap is None or mcap / 1e12 < self.mcap_min):
+            return False
+        return (uptrend and m["RSI"] >= self.rsi_min and m["Vol Ratio"] >= self.vol_ratio_min
+                and m["Pct 1M"] >= self.pct_1m_min)
+
+    def on_quote(self, ticker, when, price, day_volume):
+        """Proses satu quote; mengembalikan event dict atau None."""
+        state = self.states.get(ticker)
+        if state is None:
+            state = self.states[ticker] = TickerState()
+        state.update(when.date(), price, day_volume)
+        m = state.metrics()
+        hit = self.passes(ticker, m)
+        if hit == (ticker in self.signals):
+            return None
+        if hit:
+            self.signals.add(ticker)
+        else:
+            self.signals.discard(ticker)
+        return dict(m, Ticker=ticker, Time=when, Event="enter" if hit else "exit")
+
+    def on_quotes(self, quotes):
+        events = []
+        for ticker, when, price, day_volume in quotes:
+            event = self.on_quote(ticker, when, price, day_volume)
+            if event:
+                events.append(event)
+        return events
+
+
+# --- Feed (sumber quote) ---
+# Feed adalah iterable yang menghasilkan list quote (ticker, waktu, harga, volume kumulatif hari itu).
+
+class ReplayFeed:
+    """Putar ulang quote dari CSV (kolom: time,ticker,price,volume) untuk pengujian."""
+
+    def __init__(self, path, speed=None):
+        self.path = path
+        self.speed = speed   # None = secepatnya; 1.0 = real-time; 60 = 60x lebih cepat
+
+    def __iter__(self):
+        with open(self.path, newline="") as f:
+            rows = [(r["ticker"], datetime.fromisoformat(r["time"]), float(r["price"]), float(r["volume"]))
+                    for r in csv.DictReader(f)]
+        rows.sort(key=lambda r: r[1])
+        tick, prev = [], None
+        for row in rows:
+            if prev is not None and row[1] != prev:
+                yield tick
+                if self.speed:
+                    time.sleep((row[1] - prev).total_seconds() / self.speed)
+                tick = []
+            tick.append(row)
+            prev = row[1]
+        if tick:
+            yield tick
+
+
+class YahooPollingFeed:
+    """Polling bar 1 menit Yahoo tiap `interval` detik selama jam bursa."""
+
+    def __init__(self, tickers, interval=5, batch_size=200):
+        self.tickers = list(tickers)
+        self.interval = interval
+        self.batch_size = batch_size
+
+    def poll(self):
+        import yfinance as yf
+
+        quotes = []
+        for i in range(0, len(self.tickers), self.batch_size):
+            batch = self.tickers[i:i + self.batch_size]
+            data = yf.download(batch, period="1d", interval="1m", group_by="ticker",
+                               progress=False, threads=True)
+            quotes.extend(intraday_quotes(data, batch))
+        return quotes
+
+    def __iter__(self):
+        while is_market_open():
+            started = time.monotonic()
+            yield self.poll()
+            time.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+
+def intraday_quotes(data, tickers, today=None):
+    """
+    Quote (ticker, waktu bar terakhir WIB, harga, volume kumulatif) dari hasil
+    yf.download(interval='1m', group_by='ticker'). Hanya bar hari ini yang dipakai:
+    tepat setelah 09:00 Yahoo bisa masih mengembalikan sesi kemarin, yang tidak boleh
+    tercatat sebagai bar hari ini.
+    """
+    today = today or datetime.now(WIB).date()
+    if data is None or not len(data):
+        return []
+    index = pd.DatetimeIndex(data.index)
+    index = index.tz_localize(WIB) if index.tz is None else index.tz_convert(WIB)
+    on_day = np.asarray(index.date == today)
+    if not on_day.any():
+        return []
+    quotes = []
+    for ticker in tickers:
+        if isinstance(data.columns, pd.MultiIndex):
+            if ticker not in data.columns.get_level_values(0):
+                continue
+            df = data[ticker]
+        elif len(tickers) == 1:
+            df = data
+        else:
+            continue
+        close = df["Close"].to_numpy(dtype=float)
+        valid = on_day & ~np.isnan(close)
+        if not valid.any():
+            continue
+        last = np.flatnonzero(valid)[-1]
+        volume = np.nansum(df["Volume"].to_numpy(dtype=float)[valid])
+        quotes.append((ticker, index[last].to_pydatetime(), float(close[last]), float(volume)))
+    return quotes
+
+
+def run_live(screener, feed, on_event=print):
+    """Alirkan feed ke screener; on_event dipanggil untuk tiap event masuk/keluar sinyal."""
+    for quotes in feed:
+        for event in screener.on_quotes(quotes):
+            on_event(event)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="IDX Swing Screener - mode real-time")
+    parser.add_argument("--replay", help="CSV quote (time,ticker,price,volume) untuk diputar ulang")
+    parser.add_argument("--speed", type=float, default=None, help="Kecepatan replay (1.0 = real-time)")
+    parser.add_argument("--interval", type=float, default=5, help="Detik antar polling Yahoo")
+    parser.add_argument("--tickers", default="tickers.csv", help="CSV daftar ticker (kolom 'ticker')")
+    parser.add_argument("--rsi-min", type=float, default=53)
+    parser.add_argument("--vol-ratio-min", type=float, default=2.0)
+    parser.add_argument("--pct-1m-min", type=float, default=12)
+    parser.add_argument("--mcap-min", type=float, default=2.0, help="Market cap minimum (triliun IDR), 0 = nonaktif")
+    args = parser.parse_args()
+
+    from fundamentals import FundamentalsCache
+    from price_store import PriceStore
+
+    tickers = pd.read_csv(args.tickers)["ticker"].tolist()
+    # Market cap dari cache fundamental yang sama dengan scan, supaya filter mcap_min konsisten
+    mcaps = FundamentalsCache().market_caps(tickers) if args.mcap_min > 0 else {}
+    screener = LiveScreener(args.rsi_min, args.vol_ratio_min, args.pct_1m_min, args.mcap_min, mcaps)
+    screener.seed(PriceStore().sync(tickers), tickers)
+    print(f"Seed {len(screener.states)} saham, {len(screener.signals)} sinyal awal")
+
+    feed = ReplayFeed(args.replay, args.speed) if args.replay else YahooPollingFeed(tickers, args.interval)
+
+    def show(event):
+        arrow = "🟢 MASUK" if event["Event"] == "enter" else "⚪ KELUAR"
+        print(f"{event['Time']:%H:%M:%S} {arrow} {event['Ticker']} | Price {event['Price']:.0f} | "
+              f"RSI {event['RSI']:.1f} | Vol Ratio {event['Vol Ratio']:.2f}")
+
+    run_live(screener, feed, show)
+
+
+if __name__ == "__main__":
+    main()
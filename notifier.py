@@ -0,0 +1,214 @@
+import json
+import os
+import queue
+import random
+import threading
+import time
+from datetime import datetime
+
+import requests
+
+from price_store import _atomic_json
+from screener import WIB
+
+# Kirim sinyal ke Telegram. Dipakai oleh app Streamlit (token dari st.secrets)
+# maupun jalur headless (token dari environment variable). Pengiriman lewat antrian
+# yang dikuras worker thread: scan tidak menunggu HTTP, pesan dipecah sesuai batas
+# Telegram, rate limit per chat dihormati, dan sinyal ticker/hari yang sudah
+# terkirim tidak dikirim ulang.
+
+TELEGRAM_API = os.environ.get("TELEGRAM_API_URL", "https://api.telegram.org")   # Bisa diarahkan ke stand-in lokal
+MAX_MESSAGE_CHARS = 4096                  # Batas panjang teks sendMessage
+MIN_INTERVAL = 1.0                        # Detik antar pesan ke chat yang sama
+MAX_RETRIES = 5
+BACKOFF_BASE = 1.0                        # Detik, dikali 2 tiap percobaan ulang
+SENT_PATH = os.path.join("data", "telegram_sent.json")
+SENT_KEEP_DAYS = 7                        # Riwayat sinyal terkirim yang disimpan
+
+
+def telegram_credentials_from_env():
+    """(token, chat_id) dari env TELEGRAM_BOT_TOKEN / TELEGRAM_CHAT_ID."""
+    return os.environ.get("TELEGRAM_BOT_TOKEN"), os.environ.get("TELEGRAM_CHAT_ID")
+
+
+def _header(now):
+    return f"🚀 *IDX SIGNAL PRO - {now.strftime('%H:%M')}*\n"
+
+
+def format_entry(r):
+    return f"✅ *{r['Ticker']}*\nPrice: {r['Price']} | RSI: {r['RSI']}\nTP: {r['TP']} | SL: {r['SL']}\n*Saran: {r['Lot']} Lot*\n\n"
+
+
+def format_signals(results, now=None):
+    """Pesan Markdown dari list hasil scan (dict per saham, kolom RESULT_COLUMNS)."""
+    now = now or datetime.now()
+    msg = _header(now)
+    msg += f"Found {len(results)} potential stocks:\n"
+    msg += "--------------------------------\n"
+    for r in results:
+        msg += format_entry(r)
+    return msg
+
+
+def split_signals(results, now=None, limit=MAX_MESSAGE_CHARS):
+    """
+    Pecah hasil scan menjadi beberapa pesan <= `limit` karakter tanpa memotong entri
+    saham. Mengembalikan list (teks, [ticker di pesan itu]).
+    """
+    now = now or datetime.now()
+    entries = [(r["Ticker"], format_entry(r)) for r in results]
+    intro = f"Found {len(results)} potential stocks:\n--------------------------------\n"
+    head_room = len(_header(now)) + len(" (99/99)") + len(intro)
+
+    chunks, current, size = [], [], head_room
+    for ticker, text in entries:
+        if current and size + len(text) > limit:
+            chunks.append(current)
+            current, size = [], head_room
+        current.append((ticker, text[:limit - head_room]))
+        size += len(current[-1][1])
+    if current:
+        chunks.append(current)
+
+    messages = []
+    for i, chunk in enumerate(chunks):
+        part = f" ({i + 1}/{len(chunks)})" if len(chunks) > 1 else ""
+        text = _header(now).rstrip("\n") + part + "\n" + (intro if i == 0 else "")
+        messages.append((text + "".join(t for _, t in chunk), [ticker for ticker, _ in chunk]))
+    return messages
+
+
+def send_telegram(message, token, chat_id, timeout=10, api=None, session=None):
+    url = f"{api or TELEGRAM_API}/bot{token}/sendMessage"
+    payload = {"chat_id": chat_id, "text": message, "parse_mode": "Markdown"}
+    return (session or requests).post(url, data=payload, timeout=timeout)
+
+
+class SentLog:
+    """Sinyal (chat, hari WIB, ticker) yang sudah terkirim, dipersist ke JSON."""
+
+    def __init__(self, path=SENT_PATH, keep_days=SENT_KEEP_DAYS):
+        self.path = path
+        self.keep_days = keep_days
+        self._lock = threading.Lock()
+        try:
+            with open(path) as f:
+                self._sent = json.load(f)   # chat_id -> hari -> [ticker]
+        except (OSError, ValueError):
+            self._sent = {}
+
+    def contains(self, chat_id, day, ticker):
+        with self._lock:
+            return ticker in self._sent.get(str(chat_id), {}).get(day, ())
+
+    def mark(self, chat_id, day, tickers):
+        with self._lock:
+            days = self._sent.setdefault(str(chat_id), {})
+            days[day] = sorted(set(days.get(day, [])) | set(tickers))
+            for old in sorted(days)[:-self.keep_days]:
+                del days[old]
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            _atomic_json(self.path, self._sent)
+
+
+class TelegramNotifier:
+    """
+    Antrian pesan Telegram untuk satu chat, dikuras oleh satu worker thread.
+    `notify()` langsung kembali; hanya sinyal yang belum pernah terkirim hari ini
+    yang diantrikan. 429 dari Bot API ditunggu sesuai `retry_after`, error jaringan
+    / 5xx dicoba ulang dengan exponential backoff.
+    """
+
+    def __init__(self, token, chat_id, api=None, sent_log=None, min_interval=MIN_INTERVAL,
+                 retries=MAX_RETRIES, backoff=BACKOFF_BASE, timeout=10):
+        self.token = token
+        self.chat_id = chat_id
+        self.api = api or TELEGRAM_API
+        self.sent_log = sent_log or SentLog()
+        self.min_interval = min_interval
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.sent = 0
+        self.failed = 0
+        self.last_error = None
+        self._session = requests.Session()
+        self._queue = queue.Queue()
+        self._queued = set()          # (hari, ticker) yang sedang antri / dikirim
+        self._pending = 0
+        self._idle = threading.Condition()
+        self._last_sent = 0.0
+        self._worker = None
+        self._lock = threading.Lock()
+
+    def notify(self, results, now=None):
+        """Antrikan sinyal baru dari `results` (list dict hasil screen). Mengembalikan jumlah sinyal baru."""
+        now = now or datetime.now(WIB)
+        day = now.astimezone(WIB).strftime("%Y-%m-%d")
+        with self._lock:
+            fresh = [r for r in results if (day, r["Ticker"]) not in self._queued
+                     and not self.sent_log.contains(self.chat_id, day, r["Ticker"])]
+            self._queued.update((day, r["Ticker"]) for r in fresh)
+        for text, tickers in split_signals(fresh, now):
+            with self._idle:
+                self._pending += 1
+            self._queue.put((day, text, tickers))
+        self._ensure_worker()
+        return len(fresh)
+
+    def flush(self, timeout=None):
+        """Tunggu sampai antrian kosong (mis. sebelum proses CLI keluar). False jika timeout."""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._drain, daemon=True)
+                self._worker.start()
+
+    def _drain(self):
+        while True:
+            day, text, tickers = self._queue.get()
+            try:
+                if self._deliver(text):
+                    self.sent += 1
+                    self.sent_log.mark(self.chat_id, day, tickers)
+                else:
+                    self.failed += 1
+            except Exception as e:
+                self.failed += 1
+                self.last_error = str(e)
+            finally:
+                with self._lock:
+                    self._queued.difference_update((day, t) for t in tickers)
+                with self._idle:
+                    self._pending -= 1
+                    self._idle.notify_all()
+
+    def _deliver(self, text):
+        for attempt in range(self.retries + 1):
+            # Rate limit per chat: jaga jarak minimal antar pesan
+            wait = self._last_sent + self.min_interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self._last_sent = time.monotonic()
+            delay = self.backoff * (2 ** attempt) * (0.5 + random.random())
+            try:
+                resp = send_telegram(text, self.token, self.chat_id, self.timeout, self.api, self._session)
+            except requests.RequestException as e:
+                self.last_error = str(e)
+            else:
+                if resp.ok:
+                    return True
+                self.last_error = f"HTTP {resp.status_code}: {resp.text[:200]}"
+                if resp.status_code == 429:
+                    try:
+                        delay = float(resp.json()["parameters"]["retry_after"])
+                    except (ValueError, KeyError, TypeError):
+                        pass
+                elif resp.status_code < 500:
+                    return False   # 400/401/403: mengulang tidak akan membantu
+            if attempt < self.retries:
+                time.sleep(delay)
+        return False
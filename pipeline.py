@@ -0,0 +1,199 @@
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from indicators import METRIC_COLUMNS, compute_metrics, panel
+from instrumentation import ScanReport
+
+# Pipeline scan producer/consumer: worker thread mengunduh batch berikutnya
+# (prefetch) sementara thread utama menghitung indikator batch sebelumnya.
+# Ukuran batch menyesuaikan latency/error, ticker yang error dicoba ulang satu per satu.
+
+PREFETCH = 2               # Jumlah batch yang diunduh bersamaan di depan compute
+TICKER_RETRIES = 2         # Percobaan ulang per ticker setelah batch-nya error
+
+
+class AdaptiveBatcher:
+    """
+    Ukuran batch AIMD: dibagi dua saat batch error / lambat (tanda throttle Yahoo),
+    naik perlahan saat cepat.
+    """
+
+    def __init__(self, size=50, min_size=5, max_size=200, target_seconds=10.0, step=10):
+        self.size = size
+        self.min_size = min_size
+        self.max_size = max_size
+        self.target_seconds = target_seconds
+        self.step = step
+
+    def record(self, seconds, failed):
+        if failed or seconds > self.target_seconds:
+            self.size = max(self.min_size, self.size // 2)
+        elif seconds < self.target_seconds / 2:
+            self.size = min(self.max_size, self.size + self.step)
+        return self.size
+
+
+def _fetch(store, batch):
+    start = time.perf_counter()
+    cached = sum(store.last_date(t) is not None for t in batch)   # Cukup unduh inkremental
+    empty = store.update(batch, strict=True)
+    data = store.load_window(batch)
+    return data, empty, cached, time.perf_counter() - start
+
+
+def _account(report, batch, data, metrics, stale=False):
+    bars = panel(data, "Close", batch).notna().sum()
+    for ticker in batch:
+        if ticker in metrics.index:
+            report.counts["stale" if stale else "ok"] += 1
+        elif bars.get(ticker, 0) > 0:
+            report.counts["too_short"] += 1
+        else:
+            report.counts["no_data"] += 1
+
+
+def run_pipeline(tickers, store, batcher=None, prefetch=PREFETCH, retries=TICKER_RETRIES,
+                 progress=None, universe=None):
+    """
+    Jalankan download + compute secara overlap. Mengembalikan (metrics, ScanReport);
+    metrics berbentuk sama dengan indicators.compute_metrics untuk seluruh universe,
+    plus kolom Stale (unduhan kosong setelah retry, metrik dari bar lama di store).
+    `progress(fraction, text)` dipanggil setiap batch selesai dihitung. Dengan
+    `universe` (UniverseIndex) ticker mati / suspensi dilewati sebelum diunduh, ticker
+    tidak likuid hanya diunduh inkremental dan dihitung jika volumenya melonjak, dan
+    hasil tiap batch dicatat ke index.
+    """
+    batcher = batcher or AdaptiveBatcher()
+    report = ScanReport(len(tickers))
+    watch = set()        # Ticker tidak likuid yang dilewati kecuali volumenya melonjak
+    if universe is not None:
+        _, report.skipped = universe.prune(tickers)
+        watch = {t for t, reason in report.skipped.items() if reason == "illiquid"}
+        tickers = [t for t in tickers if t in watch or t not in report.skipped]
+    started = time.perf_counter()
+    frames, retry_queue = [], []
+    stale = {}           # ticker -> data terakhir, untuk ticker yang unduhannya kosong
+    pending = deque()
+    pos, done = 0, 0
+
+    with ThreadPoolExecutor(max_workers=prefetch) as pool:
+        def submit():
+            nonlocal pos
+            batch = tickers[pos:pos + batcher.size]
+            pos += len(batch)
+            pending.append((batch, pool.submit(_fetch, store, batch)))
+
+        while pos < len(tickers) and len(pending) < prefetch:
+            submit()
+
+        while pending:
+            batch, future = pending.popleft()
+            scan = [t for t in batch if t not in watch]
+            waited = time.perf_counter()
+            try:
+                data, empty, cached, seconds = future.result()
+                failed = False
+                report.cache("prices", cached, len(batch) - cached)
+                if universe is not None:
+                    surging = universe.surging(data, [t for t in batch if t in watch and t not in empty])
+                    for ticker in surging:
+                        del report.skipped[ticker]
+                    scan = [t for t in batch if t not in watch or t in surging]
+                    universe.observe(scan, data, [t for t in empty if t in scan])
+            except Exception as e:
+                failed, empty, seconds = True, [], 0.0
+                retry_queue.extend(scan)
+                for ticker in scan:
+                    report.failed[ticker] = str(e)
+            report.stages["wait"] = report.stages.get("wait", 0.0) + time.perf_counter() - waited
+            report.stages["download"] = report.stages.get("download", 0.0) + seconds
+            # yf.download tidak melempar error saat throttle, hanya mengembalikan data kosong
+            batcher.record(seconds, failed or len(empty) == len(batch))
+
+            # Isi ulang antrian sebelum compute supaya jaringan tidak menganggur
+            while pos < len(tickers) and len(pending) < prefetch:
+                submit()
+
+            compute_started = time.perf_counter()
+            if not failed and scan:
+                # Ticker yang unduhannya kosong tetap dihitung dari bar lama di store
+                # (ditandai Stale), lalu dicoba ulang satu per satu
+                empty = set(empty)
+                with report.stage("compute"):
+                    metrics = compute_metrics(data, scan)
+                    metrics["Stale"] = metrics.index.isin(empty)
+                    _account(report, [t for t in scan if t not in empty], data, metrics)
+                frames.append(metrics)
+                for ticker in scan:
+                    if ticker in empty:
+                        retry_queue.append(ticker)
+                        stale[ticker] = data
+            report.batches.append({"size": len(batch), "download": round(seconds, 3),
+                                   "compute": round(time.perf_counter() - compute_started, 3),
+                                   "failed": failed, "empty": len(empty)})
+
+            done += len(batch)
+            if progress:
+                progress(done / max(len(tickers), 1), f"Memproses {done}/{len(tickers)} saham "
+                                                      f"(batch {batcher.size})...")
+
+        # Ticker dari batch yang error / kosong dicoba ulang satu per satu, tetap paralel
+        for attempt in range(retries):
+            if not retry_queue:
+                break
+            report.retried += len(retry_queue)
+            futures = [(t, pool.submit(_fetch, store, [t])) for t in retry_queue]
+            retry_queue, recovered = [], 0
+            for ticker, future in futures:
+                try:
+                    data, empty, _, seconds = future.result()
+                except Exception as e:
+                    report.failed[ticker] = str(e)
+                    retry_queue.append(ticker)
+                    continue
+                report.stages["download"] = report.stages.get("download", 0.0) + seconds
+                report.failed.pop(ticker, None)
+                if empty:
+                    # Kosong sudah dicatat sekali lewat batch-nya; retry tidak menambah hitungan
+                    stale[ticker] = data
+                    retry_queue.append(ticker)
+                    continue
+                if universe is not None:
+                    universe.observe([ticker], data)
+                stale.pop(ticker, None)
+                recovered += 1
+                with report.stage("compute"):
+                    metrics = compute_metrics(data, [ticker])
+                    metrics["Stale"] = False
+                    _account(report, [ticker], data, metrics)
+                frames.append(metrics)
+            if not recovered:
+                break   # Tidak ada yang pulih: sumber sedang down / throttle, jangan dibebani lagi
+
+    # Tetap kosong setelah retry: dihitung dari bar lama (stale) atau tanpa data
+    for ticker, data in stale.items():
+        report.failed.pop(ticker, None)
+        with report.stage("compute"):
+            metrics = compute_metrics(data, [ticker])
+            metrics["Stale"] = True
+            _account(report, [ticker], data, metrics, stale=True)
+        frames.append(metrics)
+
+    report.counts["failed"] = len(report.failed)
+    report.counts["skipped"] = len(report.skipped)
+    report.elapsed = time.perf_counter() - started
+    if universe is not None:
+        universe.save()
+
+    if frames:
+        metrics = pd.concat(frames)
+        metrics = metrics[~metrics.index.duplicated(keep="last")]
+        metrics = metrics.reindex([t for t in tickers if t in metrics.index])
+        metrics["Stale"] = metrics["Stale"].astype(bool)
+    else:
+        metrics = pd.DataFrame(columns=METRIC_COLUMNS, index=pd.Index([], name="Ticker"), dtype=float)
+        metrics["Stale"] = pd.Series(dtype=bool)
+    return metrics, report
@@ -0,0 +1,378 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pyarrow.dataset as ds
+
+# Penyimpanan OHLCV lokal: satu file Parquet per ticker + manifest tanggal terakhir.
+# Scan berikutnya cukup mengunduh bar setelah tanggal terakhir yang tersimpan; ticker
+# yang bar-nya tidak berubah tidak dibaca maupun ditulis ulang.
+
+FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+DEFAULT_ROOT = os.path.join("data", "prices")
+
+OVERLAP_DAYS = 7          # Unduh ulang beberapa hari terakhir untuk cek konsistensi
+REPAIR_TOLERANCE = 0.005  # Selisih Close > 0.5% di bar overlap = split/adjustment
+MAX_STALE_DAYS = 30       # Data lebih tua dari ini diunduh ulang penuh
+CACHE_TICKERS = 2000      # Frame per ticker yang disimpan di memori (LRU)
+
+
+def _yf_download(*args, **kwargs):
+    # Import lazy supaya modul bisa dipakai tanpa yfinance (mis. dengan data palsu)
+    import yfinance as yf
+    return yf.download(*args, **kwargs)
+
+
+def _period_start(period, today=None):
+    """Ubah period gaya yfinance ('1y', '6mo', '5d', 'ytd', 'max') menjadi tanggal awal (None = semua)."""
+    today = today or datetime.now()
+    if period == "max":
+        return None
+    if period == "ytd":
+        return today.date().replace(month=1, day=1)
+    for unit, days in (("mo", 30), ("wk", 7), ("d", 1), ("y", 365)):
+        if period.endswith(unit) and period[:-len(unit)].isdigit():
+            return (today - timedelta(days=int(period[:-len(unit)]) * days)).date()
+    raise ValueError(f"Period tidak dikenal: {period}")
+
+
+def split_download(data, tickers):
+    """Pecah hasil yf.download(group_by='ticker') menjadi dict ticker -> DataFrame OHLCV."""
+    frames = {}
+    if data is None or len(data) == 0:
+        return frames
+    if not isinstance(data.columns, pd.MultiIndex):
+        # yfinance lama: satu ticker -> kolom datar
+        if len(tickers) == 1:
+            frames[tickers[0]] = _clean(data)
+        return frames
+    # Index dibersihkan sekali untuk semua ticker, lalu dipotong per ticker di numpy
+    data = _clean_index(data)
+    values = data.to_numpy(dtype=float)
+    positions = {col: i for i, col in enumerate(data.columns)}
+    for ticker in tickers:
+        fields = [f for f in FIELDS if (ticker, f) in positions]
+        if not fields:
+            continue
+        block = values[:, [positions[(ticker, f)] for f in fields]]
+        keep = ~np.isnan(block).all(axis=1)
+        if keep.any():
+            frames[ticker] = pd.DataFrame(block[keep], index=data.index[keep], columns=fields)
+    return frames
+
+
+def _clean_index(df):
+    df = df.copy()
+    df.index = pd.to_datetime(df.index)
+    if df.index.tz is not None:
+        df.index = df.index.tz_localize(None)
+    df.index = df.index.normalize()
+    df.index.name = "Date"
+    df = df[~df.index.duplicated(keep="last")]
+    return df.sort_index()
+
+
+def _clean(df):
+    df = _clean_index(df[[c for c in FIELDS if c in df.columns]])
+    return df.dropna(how="all")
+
+
+def _digest(df):
+    """
+    Sidik bar valid sejak (bar terakhir - OVERLAP_DAYS), atau None jika tidak ada bar.
+    Sama = unduhan inkremental tidak membawa perubahan. Dihitung di numpy (dipanggil per ticker).
+    """
+    values = df.to_numpy(dtype=float)
+    dates = df.index.to_numpy(dtype="datetime64[ns]").view("i8")
+    if "Close" in df.columns:
+        valid = ~np.isnan(values[:, df.columns.get_loc("Close")])
+        values, dates = values[valid], dates[valid]
+    if not len(dates):
+        return None
+    keep = dates >= dates[-1] - OVERLAP_DAYS * 86_400 * 10 ** 9
+    h = hashlib.blake2b(digest_size=8)
+    h.update(dates[keep].tobytes())
+    h.update(np.round(values[keep], 4).tobytes())
+    return pd.Timestamp(dates[-1]).strftime("%Y-%m-%d") + ":" + h.hexdigest()
+
+
+def _atomic_write(path, write):
+    """Tulis lewat file sementara unik di direktori yang sama lalu os.replace (aman antar thread/proses)."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _atomic_json(path, obj):
+    """json.dump `obj` ke `path` lewat _atomic_write."""
+    def write(tmp):
+        with open(tmp, "w") as f:
+            json.dump(obj, f)
+    _atomic_write(path, write)
+
+
+class PriceStore:
+    """Cache harga harian di disk, diperbarui secara inkremental per ticker."""
+
+    def __init__(self, root=DEFAULT_ROOT, period="1y", download=None):
+        self.root = root
+        self.period = period
+        self.download = download or _yf_download
+        os.makedirs(self.root, exist_ok=True)
+        self._lock = threading.Lock()  # update() bisa jalan paralel per batch
+        self._manifest_path = os.path.join(self.root, "_manifest.json")
+        self._manifest = self._read_manifest()
+        self._dirty = False
+        self._frames = OrderedDict()   # ticker -> DataFrame, LRU
+
+    # --- Manifest (tanggal bar terakhir + sidik bar terakhir per ticker) ---
+    def _read_manifest(self):
+        try:
+            with open(self._manifest_path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        # Format lama: ticker -> "YYYY-MM-DD"
+        return {t: v if isinstance(v, dict) else {"last": v, "digest": None} for t, v in manifest.items()}
+
+    def _write_manifest(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            snapshot = json.dumps(self._manifest)
+            self._dirty = False
+
+        def write(tmp):
+            with open(tmp, "w") as f:
+                f.write(snapshot)
+        _atomic_write(self._manifest_path, write)
+
+    def _path(self, ticker):
+        return os.path.join(self.root, f"{ticker}.parquet")
+
+    def last_date(self, ticker):
+        entry = self._manifest.get(ticker)
+        return pd.Timestamp(entry["last"]).date() if entry else None
+
+    # --- Baca / tulis ---
+    def _remember(self, ticker, df):
+        with self._lock:
+            self._frames[ticker] = df
+            self._frames.move_to_end(ticker)
+            while len(self._frames) > CACHE_TICKERS:
+                self._frames.popitem(last=False)
+
+    def read(self, ticker):
+        with self._lock:
+            df = self._frames.get(ticker)
+        if df is not None:
+            return df
+        try:
+            df = pd.read_parquet(self._path(ticker))
+        except (OSError, ValueError):
+            return None
+        self._remember(ticker, df)
+        return df
+
+    def write(self, ticker, df):
+        self._store(ticker, _clean(df))
+
+    def _store(self, ticker, df):
+        """Tulis frame yang sudah bersih (hasil split_download / _merge)."""
+        if not len(df):
+            return
+        _atomic_write(self._path(ticker), df.to_parquet)
+        self._remember(ticker, df)
+        with self._lock:
+            self._manifest[ticker] = {"last": df.index[-1].strftime("%Y-%m-%d"), "digest": _digest(df)}
+            self._dirty = True
+
+    def _unchanged(self, ticker, new):
+        """True jika unduhan inkremental identik dengan bar yang sudah tersimpan (tanpa membaca Parquet)."""
+        entry = self._manifest.get(ticker)
+        return bool(entry and entry["digest"]) and _digest(new) == entry["digest"]
+
+    def drop(self, ticker):
+        with self._lock:
+            self._manifest.pop(ticker, None)
+            self._frames.pop(ticker, None)
+            self._dirty = True
+        try:
+            os.remove(self._path(ticker))
+        except OSError:
+            pass
+
+    def _fetch(self, tickers, **kwargs):
+        data = self.download(tickers, interval="1d", group_by="ticker",
+                             progress=False, threads=True, **kwargs)
+        return split_download(data, tickers)
+
+    # --- Update inkremental ---
+    def update(self, tickers, today=None, strict=False):
+        """
+        Sinkronkan store untuk `tickers`. Ticker yang sudah tersimpan hanya diunduh
+        sejak (tanggal terakhir - OVERLAP_DAYS); yang belum ada / basi / terdeteksi
+        split diunduh ulang penuh sesuai `period`. Mengembalikan daftar ticker yang
+        unduhannya kosong. Dengan `strict=True` error download diteruskan ke pemanggil
+        (dipakai pipeline untuk retry per ticker).
+        """
+        today = today or datetime.now().date()
+        full, incremental = [], {}
+        for ticker in tickers:
+            last = self.last_date(ticker)
+            if last is None or (today - last).days > MAX_STALE_DAYS:
+                full.append(ticker)
+            else:
+                # Bar terakhir selalu di-refresh: saat jam bursa bar hari ini masih berubah
+                start = last - timedelta(days=OVERLAP_DAYS)
+                incremental.setdefault(start, []).append(ticker)
+
+        empty = []
+        for start, group in incremental.items():
+            try:
+                fresh = self._fetch(group, start=start.strftime("%Y-%m-%d"))
+            except Exception:
+                if strict:
+                    raise
+                fresh = {}
+            for ticker in group:
+                new = fresh.get(ticker)
+                if new is None:
+                    empty.append(ticker)
+                    continue
+                if self._unchanged(ticker, new):
+                    continue
+                old = self.read(ticker)
+                merged = self._merge(old, new)
+                if merged is None:
+                    full.append(ticker)
+                elif merged is not old:
+                    self._store(ticker, merged)
+
+        if full:
+            try:
+                fresh = self._fetch(full, period=self.period)
+            except Exception:
+                if strict:
+                    raise
+                fresh = {}
+            for ticker in full:
+                if ticker in fresh:
+                    self._store(ticker, fresh[ticker])
+                else:
+                    empty.append(ticker)
+
+        self._write_manifest()
+        return empty
+
+    @staticmethod
+    def _merge(old, new):
+        """
+        Gabungkan bar baru ke data lama. Mengembalikan `old` apa adanya jika tidak ada
+        perubahan, atau None jika perlu unduh ulang penuh:
+        - tidak ada bar overlap (gap: data baru tidak menyambung ke data lama), atau
+        - Close di bar overlap berbeda > REPAIR_TOLERANCE (split / dividen disesuaikan ulang).
+        """
+        if old is None or not len(old):
+            return None
+        new = new.dropna(subset=["Close"])
+        if not len(new):
+            return old
+        overlap = old.index.intersection(new.index)
+        # Bar terakhir lama bisa masih parsial (intraday), jadi abaikan saat membandingkan
+        overlap = overlap[overlap < old.index[-1]]
+        if not len(overlap) and new.index[0] > old.index[-1]:
+            return None
+        if len(overlap):
+            a = old.loc[overlap, "Close"].astype(float)
+            b = new.loc[overlap, "Close"].astype(float)
+            drift = ((a - b).abs() / b.abs()).max()
+            if drift > REPAIR_TOLERANCE:
+                return None
+        head = old[old.index < new.index[0]]
+        tail = old[old.index >= new.index[0]]
+        if tail.index.equals(new.index) and np.allclose(tail[new.columns].to_numpy(dtype=float),
+                                                        new.to_numpy(dtype=float), equal_nan=True):
+            return old
+        return pd.concat([head, new])
+
+    # --- Baca kembali dalam satu panggilan ---
+    def _read_many(self, tickers):
+        """Baca banyak file Parquet sekaligus (pyarrow, paralel tanpa GIL) -> dict ticker -> (tanggal, nilai)."""
+        paths = {self._path(t): t for t in tickers if os.path.exists(self._path(t))}
+        if not paths:
+            return {}
+        table = ds.dataset(list(paths), format="parquet").to_table(columns=["Date", *FIELDS, "__filename"])
+        names = table.column("__filename").to_numpy(zero_copy_only=False)
+        dates = table.column("Date").to_numpy().astype("datetime64[ns]").view("i8")
+        values = np.column_stack([table.column(f).to_numpy(zero_copy_only=False).astype(float) for f in FIELDS])
+        codes, uniques = pd.factorize(names)
+        order = np.lexsort((dates, codes))
+        dates, values = dates[order], values[order]
+        bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+        parts = {}
+        for code, path in enumerate(uniques):
+            rows = slice(bounds[code], bounds[code + 1])
+            ticker = paths[path]
+            parts[ticker] = (dates[rows], values[rows])
+            self._remember(ticker, pd.DataFrame(values[rows], columns=FIELDS,
+                                                index=pd.DatetimeIndex(dates[rows], name="Date")))
+        return parts
+
+    def load(self, tickers, start=None):
+        """
+        Baca banyak ticker sekaligus dalam bentuk yang sama dengan
+        yf.download(..., group_by='ticker'): kolom MultiIndex (ticker, field).
+        Ticker di cache memori tidak dibaca ulang dari disk; sisanya dibaca dalam
+        satu dataset pyarrow lalu disusun langsung ke array tanggal x (ticker, field).
+        """
+        parts, missing = {}, []
+        for ticker in tickers:
+            with self._lock:
+                df = self._frames.get(ticker)
+            if df is None:
+                missing.append(ticker)
+                continue
+            values = df.reindex(columns=FIELDS).to_numpy(dtype=float)
+            parts[ticker] = (df.index.to_numpy(dtype="datetime64[ns]").view("i8"), values)
+        if missing:
+            parts.update(self._read_many(missing))
+
+        cutoff = pd.Timestamp(start).value if start is not None else None
+        order = [t for t in tickers if t in parts]
+        if cutoff is not None:
+            parts = {t: (d[d >= cutoff], v[d >= cutoff]) for t, (d, v) in parts.items()}
+            order = [t for t in order if len(parts[t][0])]
+        if not order:
+            return pd.DataFrame(columns=pd.MultiIndex.from_tuples([], names=["Ticker", "Price"]))
+
+        index = np.unique(np.concatenate([parts[t][0] for t in order]))
+        out = np.full((len(index), len(order) * len(FIELDS)), np.nan)
+        for i, ticker in enumerate(order):
+            dates, values = parts[ticker]
+            out[np.searchsorted(index, dates), i * len(FIELDS):(i + 1) * len(FIELDS)] = values
+        columns = pd.MultiIndex.from_product([order, FIELDS], names=["Ticker", "Price"])
+        return pd.DataFrame(out, index=pd.DatetimeIndex(index, name="Date"), columns=columns)
+
+    def load_window(self, tickers):
+        """load() dibatasi ke `period` terakhir (mis. 1 tahun), seperti hasil yf.download."""
+        return self.load(tickers, start=_period_start(self.period))
+
+    def sync(self, tickers, strict=False):
+        """update() lalu load_window(); pengganti langsung untuk yf.download(period='1y')."""
+        self.update(tickers, strict=strict)
+        return self.load_window(tickers)
@@ -0,0 +1,141 @@
+import os
+import threading
+import time
+
+from instrumentation import profiled
+from screener import LATEST_PATH, build_snapshot, load_snapshot, save_snapshot
+
+# Service scan bersama (singleton per proses). Semua sesi Streamlit memakai satu
+# instance: permintaan scan yang sama saat masih berjalan digabung ke satu job,
+# sesi lain cukup memantau progress-nya, dan hasilnya dipakai bersama selama
+# masih dalam jendela kesegaran. Snapshot juga disimpan ke disk, jadi hasil scan
+# terjadwal (cli.py schedule) langsung terlihat di app.
+
+MAX_AGE = int(os.environ.get("IDX_SCAN_MAX_AGE", 10 * 60))   # detik
+MAX_SNAPSHOTS = 4                                             # Snapshot berbeda yang disimpan (default + upload)
+
+
+class ScanJob:
+    """Satu scan yang sedang / sudah berjalan. Dibaca bersama oleh banyak sesi."""
+
+    def __init__(self, key):
+        self.key = key
+        self.fraction = 0.0
+        self.text = "Menunggu giliran scan..."
+        self.result = None
+        self.error = None
+        self.warning = None        # Masalah yang tidak menggagalkan scan (mis. ekspor metrics)
+        self.started = time.time()
+        self.finished = None
+        self.subscribers = 1
+        self._done = threading.Event()
+
+    def update(self, fraction, text):
+        self.fraction = fraction
+        self.text = text
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def age(self):
+        return time.time() - self.finished if self.finished else 0.0
+
+
+class ScanService:
+    def __init__(self, store, fundamentals, max_age=MAX_AGE, build=build_snapshot, path=LATEST_PATH,
+                 universe=None):
+        self.store = store
+        self.fundamentals = fundamentals
+        self.universe = universe
+        self.max_age = max_age
+        self.build = build
+        self.path = path
+        self._disk_mtime = None
+        self._lock = threading.Lock()
+        self._running = {}   # key -> ScanJob yang sedang berjalan
+        self._latest = {}    # key -> ScanJob terakhir yang sukses
+
+    def request(self, tickers, force=False):
+        """
+        Minta scan untuk `tickers`. Mengembalikan job yang sedang berjalan untuk daftar
+        yang sama (coalescing), snapshot terakhir jika umurnya < max_age, atau job baru.
+        `force` melewati jendela kesegaran tapi tetap bergabung ke job yang sedang jalan.
+        """
+        key = tuple(tickers)
+        self._load_from_disk()
+        with self._lock:
+            job = self._running.get(key)
+            if job:
+                job.subscribers += 1
+                return job
+            latest = self._latest.get(key)
+            if latest and not force and latest.age() < self.max_age:
+                return latest
+            job = self._running[key] = ScanJob(key)
+        threading.Thread(target=self._run, args=(job,), daemon=True).start()
+        return job
+
+    def latest(self, tickers):
+        """Job sukses terakhir untuk `tickers` (berapa pun umurnya), atau None."""
+        self._load_from_disk()
+        with self._lock:
+            return self._latest.get(tuple(tickers))
+
+    def _load_from_disk(self):
+        """Ambil snapshot dari disk jika file lebih baru (mis. ditulis scheduler di proses lain)."""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime == self._disk_mtime:
+            return
+        self._disk_mtime = mtime
+        saved = load_snapshot(self.path)
+        if not saved:
+            return
+        key = tuple(saved["tickers"])
+        with self._lock:
+            current = self._latest.get(key)
+            if current and current.finished >= saved["finished"]:
+                return
+            job = ScanJob(key)
+            job.result, job.finished, job.fraction = saved["snapshot"], saved["finished"], 1.0
+            job._done.set()
+            self._remember(job)
+
+    def _remember(self, job):
+        self._latest.pop(job.key, None)
+        self._latest[job.key] = job
+        while len(self._latest) > MAX_SNAPSHOTS:
+            self._latest.pop(next(iter(self._latest)))
+
+    def _run(self, job):
+        try:
+            extra = {"universe": self.universe} if self.universe is not None else {}
+            with profiled():
+                job.result = self.build(list(job.key), self.store, self.fundamentals, progress=job.update, **extra)
+            job.finished = time.time()
+            report = job.result.attrs.get("report")
+            if report is None:
+                save_snapshot(job.result, job.key, self.path, job.finished)
+            else:
+                with report.stage("save"):
+                    save_snapshot(job.result, job.key, self.path, job.finished)
+                try:
+                    report.publish()
+                except OSError as e:
+                    # Snapshot sudah tersimpan: gagal ekspor metrics tidak boleh menggagalkan scan
+                    job.warning = f"Gagal ekspor metrics scan: {e}"
+        except Exception as e:
+            job.error = e
+        finally:
+            job.finished = job.finished or time.time()
+            with self._lock:
+                self._running.pop(job.key, None)
+                if job.error is None:
+                    self._remember(job)
+            job._done.set()
@@ -0,0 +1,158 @@
+import os
+import pickle
+import time
+from datetime import timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+from pipeline import AdaptiveBatcher, run_pipeline
+from price_store import _atomic_write
+
+# Scan dua tahap:
+# 1. build_snapshot(): mahal (download + indikator + market cap), tanpa filter slider.
+# 2. screen(): murah, filter + SL/TP/lot sebagai mask vektor di atas snapshot.
+
+WIB = timezone(timedelta(hours=7))
+BATCH_SIZE = 50
+LATEST_PATH = os.path.join("data", "latest_scan.pkl")
+DEFAULT_FILTERS = {
+    "rsi_min": 53,
+    "vol_ratio_min": 2.0,
+    "mcap_min": 2.0,
+    "pct_1m_min": 12,
+    "total_budget": 10000000,
+    "risk_per_trade": 1.0,
+}
+RESULT_COLUMNS = ["Ticker", "Price", "RSI", "Vol Ratio", "SL", "TP", "Lot", "Alokasi", "MCap (T)"]
+
+
+def uptrend_mask(snapshot):
+    # Syarat: Harga > SMA20. Jika SMA200 tersedia, harus > SMA200.
+    above_sma20 = snapshot["Price"] > snapshot["SMA20"]
+    above_sma200 = snapshot["SMA200"].isna() | (snapshot["SMA20"] > snapshot["SMA200"])
+    return above_sma20 & above_sma200
+
+
+def build_snapshot(tickers, store, fundamentals, batch_size=BATCH_SIZE, progress=None, universe=None):
+    """
+    Tahap mahal: metrik per ticker tanpa filter (Price, SMA20, SMA200, RSI, Vol Ratio,
+    Pct 1M, Bars, Uptrend, MCap). Market cap hanya diambil untuk ticker uptrend karena
+    ticker lain tidak akan pernah lolos filter; sisanya NaN.
+    `progress(fraction, text)` dipanggil tiap batch. Rekap pipeline (jumlah ticker
+    OK / tanpa data / gagal / dilewati) ada di snapshot.attrs['report']. `universe`
+    (UniverseIndex, opsional) melewati ticker mati / tidak likuid sebelum diunduh.
+    """
+    started = time.perf_counter()
+    snapshot, report = run_pipeline(tickers, store, AdaptiveBatcher(size=batch_size), progress=progress,
+                                    universe=universe)
+    snapshot["Uptrend"] = uptrend_mask(snapshot)
+
+    if progress:
+        progress(1.0, "Mengambil market cap...")
+    candidates = list(snapshot.index[snapshot["Uptrend"]])
+    cached = sum(fundamentals.get(t) is not None for t in candidates)
+    report.cache("fundamentals", cached, len(candidates) - cached)
+    with report.stage("fundamentals"):
+        caps = fundamentals.market_caps(candidates)
+    snapshot["MCap"] = pd.Series(caps, dtype=float).reindex(snapshot.index)
+
+    report.elapsed = time.perf_counter() - started
+    snapshot.attrs["report"] = report
+    return snapshot
+
+
+def filter_mask(snapshot, rsi_min, vol_ratio_min, mcap_min, pct_1m_min):
+    """Mask ticker yang lolos semua filter (mcap_min dalam triliun IDR). Baris Stale tidak pernah lolos."""
+    fresh = ~snapshot["Stale"] if "Stale" in snapshot else True
+    return (
+        fresh
+        & snapshot["Uptrend"]
+        & (snapshot["RSI"] >= rsi_min)
+        & (snapshot["Vol Ratio"] >= vol_ratio_min)
+        & (snapshot["Pct 1M"] >= pct_1m_min)
+        & (snapshot["MCap"] / 1e12 >= mcap_min)
+    )
+
+
+def plan_trades(hits, total_budget, risk_per_trade):
+    """SL/TP/lot untuk semua hit sekaligus (logika risk & money management yang sama)."""
+    price = hits["Price"].to_numpy(float)
+    sma20 = hits["SMA20"].to_numpy(float)
+
+    sl_price = sma20 * 0.98
+    risk_frac = (price - sl_price) / price
+    # Proteksi jika SL terlalu dekat/jauh, gunakan default 5%
+    sl_price = np.where((risk_frac < 0.02) | (risk_frac > 0.10), price * 0.95, sl_price)
+    risk_per_sh = price - sl_price
+    tp_price = price + risk_per_sh * 2  # Reward 1:2
+
+    # Kalkulasi Lot
+    amt_to_risk = total_budget * (risk_per_trade / 100)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        lots = np.where(risk_per_sh > 0, np.floor(amt_to_risk / risk_per_sh / 100), 0)
+    # Proteksi: Total beli tidak boleh > modal
+    lots = np.where(lots * 100 * price > total_budget, np.floor(total_budget / (100 * price)), lots)
+    lots = lots.astype(int)
+
+    return pd.DataFrame({
+        "Ticker": hits.index.str.replace(".JK", "", regex=False),
+        "Price": price.astype(int),
+        "RSI": hits["RSI"].round(1).to_numpy(),
+        "Vol Ratio": hits["Vol Ratio"].round(2).to_numpy(),
+        "SL": sl_price.astype(int),
+        "TP": tp_price.astype(int),
+        "Lot": lots,
+        "Alokasi": [f"Rp {int(v):,}" for v in lots * 100 * price],
+        "MCap (T)": (hits["MCap"] / 1e12).round(1).to_numpy(),
+    }, columns=RESULT_COLUMNS)
+
+
+def screen(snapshot, rsi_min, vol_ratio_min, mcap_min, pct_1m_min, total_budget, risk_per_trade):
+    """Tahap murah: filter + sizing di atas snapshot. Aman dipanggil di tiap rerun."""
+    hits = snapshot[filter_mask(snapshot, rsi_min, vol_ratio_min, mcap_min, pct_1m_min)]
+    return plan_trades(hits, total_budget, risk_per_trade)
+
+
+# --- Snapshot terakhir di disk: ditulis oleh scan (CLI/scheduler/app), dibaca viewer ---
+def save_snapshot(snapshot, tickers, path=LATEST_PATH, finished=None):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    saved = {"tickers": list(tickers), "finished": finished or time.time(), "snapshot": snapshot}
+
+    def write(tmp):
+        with open(tmp, "wb") as f:
+            pickle.dump(saved, f)
+
+    # File sementara unik: app dan scheduler (proses lain) bisa menyimpan bersamaan
+    _atomic_write(path, write)
+
+
+def load_snapshot(path=LATEST_PATH):
+    """Dict {'tickers', 'finished', 'snapshot'} dari scan terakhir, atau None."""
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+
+
+def run_scan(tickers, store, fundamentals, filters=None, progress=None, path=LATEST_PATH, universe=None,
+             publish=True):
+    """
+    Scan lengkap tanpa UI: snapshot -> simpan ke disk -> hasil terfilter (DataFrame).
+    Rekap (snapshot.attrs['report']) dilengkapi outcome filter lalu dipublish ke
+    JSON lines + file Prometheus; `publish=False` jika pemanggil masih menambah tahap
+    (mis. notify) dan mempublish sendiri.
+    """
+    filters = dict(DEFAULT_FILTERS, **(filters or {}))
+    snapshot = build_snapshot(tickers, store, fundamentals, progress=progress, universe=universe)
+    report = snapshot.attrs["report"]
+    with report.stage("save"):
+        save_snapshot(snapshot, tickers, path)
+    with report.stage("screen"):
+        results = screen(snapshot, **filters)
+    mask_keys = ("rsi_min", "vol_ratio_min", "mcap_min", "pct_1m_min")
+    report.counts.update(report.screen_counts(snapshot, filter_mask(snapshot, *(filters[k] for k in mask_keys))))
+    if publish:
+        report.publish()
+    return snapshot, results
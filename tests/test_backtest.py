@@ -0,0 +1,34 @@
+import pandas as pd
+import pytest
+
+from backtest import prepare, run_backtest
+from fake_source import market_cap, synthetic_market
+
+LOOSE = {"vol_ratio_min": 1.2, "pct_1m_min": 5}
+
+
+@pytest.fixture(scope="module")
+def market():
+    return synthetic_market(60, days=400, seed=2)
+
+
+@pytest.fixture(scope="module")
+def data(market):
+    return pd.concat(market, axis=1, sort=True)
+
+
+def test_mcap_min_filters_small_caps(market, data):
+    caps = {t: market_cap(t) for t in market}
+    summary, trades, _ = run_backtest(prepare(data, list(market), caps), dict(LOOSE, mcap_min=2.0))
+    assert len(trades) and summary["mcap_min"] == 2.0
+    assert all(caps[t] >= 2e12 for t in trades["Ticker"])
+
+    unknown = run_backtest(prepare(data, list(market), {}), dict(LOOSE, mcap_min=2.0))[1]
+    assert unknown.empty   # Seperti app: tanpa market cap tidak lolos
+
+
+def test_without_market_caps_filter_is_off(market, data):
+    summary, trades, _ = run_backtest(prepare(data, list(market)), dict(LOOSE, mcap_min=2.0))
+    off = run_backtest(prepare(data, list(market)), dict(LOOSE, mcap_min=0.0))[1]
+    assert summary["mcap_min"] == 0.0
+    assert len(trades) == len(off)
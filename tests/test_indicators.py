@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from fake_source import synthetic_market
+from indicators import TOLERANCE, compare_with_pandas_ta, compute_metrics
+
+
+@pytest.fixture
+def market():
+    # Campuran saham lama dan baru listing, dengan bar kosong dan hari tanpa transaksi
+    frames = synthetic_market(40, days=260, seed=3, short_rate=0.3, gap_rate=0.05, zero_volume_rate=0.05)
+    return pd.concat(frames, axis=1, sort=True)
+
+
+def reference_metrics(df):
+    """Perhitungan lama per ticker dengan pandas murni (setara ta.sma / ta.rsi)."""
+    df = df.dropna(subset=["Close"])
+    close = df["Close"]
+    diff = close.diff()
+    gain = diff.clip(lower=0).ewm(alpha=1 / 14, min_periods=14).mean()
+    loss = (-diff).clip(lower=0).ewm(alpha=1 / 14, min_periods=14).mean()
+    avg_vol = df["Volume"].fillna(0).tail(20).mean()
+    prev = close.iloc[-21] if len(close) >= 21 else close.iloc[0]
+    return {
+        "Price": close.iloc[-1],
+        "SMA20": close.rolling(20).mean().iloc[-1],
+        "SMA200": close.rolling(200).mean().iloc[-1] if len(close) >= 200 else np.nan,
+        "RSI": (100 * gain / (gain + loss)).iloc[-1],
+        "Vol Ratio": df["Volume"].fillna(0).iloc[-1] / avg_vol if avg_vol > 0 else 0.0,
+        "Pct 1M": (close.iloc[-1] - prev) / prev * 100,
+        "Bars": len(close),
+    }
+
+
+def test_metrics_match_pandas_reference_with_gaps(market):
+    metrics = compute_metrics(market)
+    tickers = market.columns.get_level_values(0).unique()
+    expected = {t: reference_metrics(market[t]) for t in tickers if market[t]["Close"].notna().sum() >= 20}
+
+    assert sorted(metrics.index) == sorted(expected)
+    assert metrics["SMA200"].isna().any() and metrics["SMA200"].notna().any()
+    for ticker, ref in expected.items():
+        for col, value in ref.items():
+            got = metrics.at[ticker, col]
+            if np.isnan(value):
+                assert np.isnan(got), (ticker, col)
+            else:
+                assert abs(got - value) <= TOLERANCE, (ticker, col, got, value)
+
+
+def test_short_history_is_dropped(market):
+    short = market.copy()
+    short.iloc[:-10] = np.nan
+    assert compute_metrics(short).empty
+
+
+def test_matches_pandas_ta(market):
+    pytest.importorskip("pandas_ta")
+    diffs = compare_with_pandas_ta(market)
+    assert max(diffs.values()) <= TOLERANCE
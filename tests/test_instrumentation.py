@@ -0,0 +1,47 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from instrumentation import ScanReport
+from scan_service import ScanService
+
+
+class BrokenExport(ScanReport):
+    def publish(self, *args, **kwargs):
+        raise OSError("disk penuh")
+
+
+def make_report():
+    report = ScanReport(10)
+    report.counts["ok"] = 10
+    with report.stage("compute"):
+        pass
+    return report
+
+
+def test_concurrent_publish_is_atomic(tmp_path):
+    jsonl, prom = str(tmp_path / "metrics.jsonl"), str(tmp_path / "metrics.prom")
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda _: make_report().publish(jsonl, prom), range(40)))
+
+    assert sorted(os.listdir(tmp_path)) == ["metrics.jsonl", "metrics.prom"]
+    with open(jsonl) as f:
+        assert [json.loads(line)["counts"]["ok"] for line in f] == [10] * 40
+    with open(prom) as f:
+        assert 'idx_scan_tickers{outcome="ok"} 10' in f.read()
+
+
+def test_metrics_export_failure_does_not_fail_scan(tmp_path):
+    def build(tickers, store, fundamentals, progress=None):
+        snapshot = pd.DataFrame({"Price": [1.0]}, index=pd.Index(tickers, name="Ticker"))
+        snapshot.attrs["report"] = BrokenExport(len(tickers))
+        return snapshot
+
+    service = ScanService(None, None, build=build, path=str(tmp_path / "latest.pkl"))
+    job = service.request(["AAAA.JK"])
+    assert job.wait(10)
+    assert job.error is None
+    assert "disk penuh" in job.warning
+    assert service.latest(["AAAA.JK"]) is job
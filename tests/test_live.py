@@ -0,0 +1,105 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicators import TOLERANCE, compute_metrics
+import live
+from live import LiveScreener, ReplayFeed, YahooPollingFeed, intraday_quotes, run_live
+from screener import WIB
+
+RISING, FLAT = "RISE.JK", "FLAT.JK"
+
+
+@pytest.fixture
+def history():
+    # 60 hari naik 0,5%/hari: uptrend & RSI tinggi, tapi Pct 1M (~10%) dan Vol Ratio (1x) belum lolos
+    index = pd.bdate_range(end="2026-10-16", periods=60, name="Date")
+    rising = 1000 * 1.005 ** np.arange(60)
+    frames = {
+        RISING: pd.DataFrame({"Close": rising, "Volume": 1e6}, index=index),
+        FLAT: pd.DataFrame({"Close": 1000.0, "Volume": 1e6}, index=index),
+    }
+    return pd.concat(frames, axis=1)
+
+
+def write_replay(path, rows):
+    path.write_text("time,ticker,price,volume\n" + "".join(f"{t},{k},{p},{v}\n" for t, k, p, v in rows))
+    return str(path)
+
+
+def test_replay_emits_enter_then_exit(tmp_path, history):
+    last = history[RISING]["Close"].iloc[-1]
+    replay = write_replay(tmp_path / "replay.csv", [
+        ("2026-10-19T09:05:00+07:00", RISING, last * 1.03, 3e6),   # Lonjakan harga & volume -> masuk
+        ("2026-10-19T09:05:00+07:00", FLAT, 1000.0, 5e6),
+        ("2026-10-19T10:00:00+07:00", RISING, last * 0.97, 3.5e6),  # Pct 1M jatuh di bawah 12% -> keluar
+        ("2026-10-19T10:00:00+07:00", FLAT, 1000.0, 6e6),
+    ])
+    screener = LiveScreener()
+    screener.seed(history)
+    assert screener.signals == set()
+
+    events = []
+    run_live(screener, ReplayFeed(replay), on_event=events.append)
+    assert [(e["Ticker"], e["Event"], e["Time"].hour) for e in events] == [
+        (RISING, "enter", 9), (RISING, "exit", 10)]
+    assert screener.signals == set()
+
+
+def test_live_metrics_match_batch_engine(tmp_path, history):
+    last = history[RISING]["Close"].iloc[-1]
+    replay = write_replay(tmp_path / "replay.csv", [
+        ("2026-10-19T09:05:00+07:00", RISING, last * 1.01, 1e6),
+        ("2026-10-19T11:00:00+07:00", RISING, last * 1.02, 2e6),
+        ("2026-10-20T09:30:00+07:00", RISING, last * 1.04, 4e5),   # Hari baru: bar 19/10 di-commit
+    ])
+    screener = LiveScreener()
+    screener.seed(history)
+    run_live(screener, ReplayFeed(replay), on_event=lambda event: None)
+
+    today = pd.DataFrame({"Close": [last * 1.02, last * 1.04], "Volume": [2e6, 4e5]},
+                         index=pd.DatetimeIndex(["2026-10-19", "2026-10-20"], name="Date"))
+    data = pd.concat({RISING: pd.concat([history[RISING], today])}, axis=1)
+    expected = compute_metrics(data).loc[RISING]
+    live = screener.states[RISING].metrics()
+    for col, value in expected.items():
+        if np.isnan(value):
+            assert np.isnan(live[col]), col
+        else:
+            assert abs(live[col] - value) <= TOLERANCE, (col, live[col], value)
+
+
+def test_intraday_quotes_use_todays_last_bar():
+    # Bar 1 menit dari Yahoo dalam UTC, termasuk sisa sesi kemarin
+    index = pd.DatetimeIndex(["2026-10-16 08:59", "2026-10-19 02:00", "2026-10-19 02:01", "2026-10-19 02:02"],
+                             tz="UTC")
+    data = pd.concat({
+        RISING: pd.DataFrame({"Close": [990.0, 1000.0, 1010.0, np.nan], "Volume": [9e5, 1e5, 2e5, np.nan]}, index),
+        FLAT: pd.DataFrame({"Close": [1000.0, np.nan, np.nan, np.nan], "Volume": [1e6, np.nan, np.nan, np.nan]}, index),
+    }, axis=1)
+
+    quotes = intraday_quotes(data, [RISING, FLAT], today=pd.Timestamp("2026-10-19").date())
+    assert len(quotes) == 1
+    ticker, when, price, volume = quotes[0]
+    assert (ticker, price, volume) == (RISING, 1010.0, 3e5)
+    assert when == pd.Timestamp("2026-10-19 09:01", tz=WIB).to_pydatetime()
+
+
+def test_polling_feed_yields_until_market_closes(monkeypatch, history):
+    open_checks = iter([True, True, False])
+    monkeypatch.setattr(live, "is_market_open", lambda now=None: next(open_checks))
+    last = history[RISING]["Close"].iloc[-1]
+    when = datetime(2026, 10, 19, 9, 5, tzinfo=WIB)
+    feed = YahooPollingFeed([RISING], interval=0)
+    monkeypatch.setattr(feed, "poll", lambda: [(RISING, when, last * 1.03, 3e6)])
+
+    assert list(feed) == [[(RISING, when, last * 1.03, 3e6)]] * 2
+
+    screener = LiveScreener()
+    screener.seed(history)
+    open_checks = iter([True, False])
+    events = []
+    run_live(screener, feed, on_event=events.append)
+    assert [(e["Ticker"], e["Event"]) for e in events] == [(RISING, "enter")]
@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from fake_source import FakeTelegramAPI
+from notifier import MAX_MESSAGE_CHARS, SentLog, TelegramNotifier, split_signals
+from screener import WIB
+
+NOW = datetime(2026, 10, 19, 9, 15, tzinfo=WIB)
+
+
+def signals(n, prefix="T"):
+    return [{"Ticker": f"{prefix}{i:03d}.JK", "Price": 1000 + i, "RSI": 60.5, "TP": 1100 + i,
+             "SL": 950 + i, "Lot": 10} for i in range(n)]
+
+
+def make_notifier(api, tmp_path, **kwargs):
+    kwargs = dict(dict(min_interval=0.0, backoff=0.01, retries=3), **kwargs)
+    return TelegramNotifier("TOKEN", "42", api=api.url, sent_log=SentLog(str(tmp_path / "sent.json")), **kwargs)
+
+
+def test_split_keeps_entries_whole_and_under_limit():
+    results = signals(300)
+    messages = split_signals(results, NOW)
+    assert len(messages) > 1
+    assert all(len(text) <= MAX_MESSAGE_CHARS for text, _ in messages)
+    assert [t for _, tickers in messages for t in tickers] == [r["Ticker"] for r in results]
+    for text, tickers in messages:
+        assert all(f"*{t}*" in text for t in tickers)
+    assert f"(1/{len(messages)})" in messages[0][0]
+
+
+def test_long_scan_is_delivered_in_parts(tmp_path):
+    with FakeTelegramAPI() as api:
+        notifier = make_notifier(api, tmp_path)
+        assert notifier.notify(signals(300), NOW) == 300
+        assert notifier.flush(10)
+    assert notifier.sent == len(api.messages) > 1
+    assert all(len(m["text"]) <= MAX_MESSAGE_CHARS for m in api.messages)
+
+
+def test_rate_limit_waits_for_retry_after(tmp_path):
+    with FakeTelegramAPI(rate_limit=0.5, retry_after=1) as api:
+        notifier = make_notifier(api, tmp_path)
+        notifier.notify(signals(80), NOW)
+        assert notifier.flush(30)
+    assert notifier.failed == 0
+    assert api.requests > len(api.messages) == notifier.sent
+    assert "429" in notifier.last_error
+
+
+def test_server_errors_are_retried(tmp_path):
+    with FakeTelegramAPI(fail_first=2) as api:
+        notifier = make_notifier(api, tmp_path)
+        notifier.notify(signals(3), NOW)
+        assert notifier.flush(10)
+    assert (api.requests, notifier.sent, notifier.failed) == (3, 1, 0)
+
+
+def test_client_errors_are_not_retried(tmp_path):
+    with FakeTelegramAPI(max_chars=50) as api:
+        notifier = make_notifier(api, tmp_path)
+        notifier.notify(signals(3), NOW)
+        assert notifier.flush(10)
+    assert (api.requests, notifier.sent, notifier.failed) == (1, 0, 1)
+    assert not SentLog(str(tmp_path / "sent.json")).contains("42", "2026-10-19", "T000.JK")
+
+
+@pytest.mark.parametrize("restart", [False, True])
+def test_signals_are_sent_once_per_day(tmp_path, restart):
+    with FakeTelegramAPI() as api:
+        notifier = make_notifier(api, tmp_path)
+        assert notifier.notify(signals(3), NOW) == 3
+        assert notifier.flush(10)
+        if restart:   # Proses baru (mis. scan CLI berikutnya) membaca log dari disk
+            notifier = make_notifier(api, tmp_path)
+        assert notifier.notify(signals(3) + signals(1, prefix="N"), NOW + timedelta(hours=2)) == 1
+        assert notifier.notify(signals(3), NOW + timedelta(days=1)) == 3
+        assert notifier.flush(10)
+    assert len(api.messages) == 3
+    assert "N000.JK" in api.messages[1]["text"] and "T000.JK" not in api.messages[1]["text"]
@@ -0,0 +1,65 @@
+import pytest
+
+from fake_source import FakeSource, synthetic_market
+from pipeline import AdaptiveBatcher, run_pipeline
+from price_store import PriceStore
+
+
+@pytest.fixture
+def market():
+    return synthetic_market(80, days=260, seed=5, short_rate=0.1)
+
+
+def make_store(tmp_path, source):
+    return PriceStore(root=str(tmp_path / "prices"), download=source)
+
+
+def outcome_total(report):
+    return sum(report.counts[k] for k in report.PIPELINE_OUTCOMES)
+
+
+def test_every_ticker_has_one_outcome(tmp_path, market):
+    dead = sorted(market)[:3]
+    source = FakeSource(market, error_rate=0.2, max_batch=30, dead=dead, seed=1)
+    metrics, report = run_pipeline(list(market), make_store(tmp_path, source), AdaptiveBatcher(size=50))
+
+    assert outcome_total(report) == len(market)
+    assert report.counts["ok"] + report.counts["stale"] == len(metrics)
+    assert report.counts["failed"] == len(report.failed)
+    assert set(dead) <= set(market) - set(metrics.index)
+    assert not metrics["Stale"].any()
+
+
+def test_throttled_batches_shrink_and_are_retried(tmp_path, market):
+    source = FakeSource(market, max_batch=30)
+    metrics, report = run_pipeline(list(market), make_store(tmp_path, source), AdaptiveBatcher(size=50))
+
+    # Batch > max_batch selalu error: ukuran batch turun dan ticker-nya pulih lewat retry
+    assert report.batches[0]["failed"]
+    assert report.retried >= 50
+    assert report.counts["failed"] == 0
+    assert max(size for size, _, _ in source.calls[-10:]) <= 30
+    assert outcome_total(report) == len(market)
+
+
+def test_dead_tickers_are_retried_then_counted_no_data(tmp_path, market):
+    dead = sorted(market)[:5]
+    source = FakeSource(market, dead=dead)
+    _, report = run_pipeline(list(market), make_store(tmp_path, source), retries=2)
+
+    assert report.counts["no_data"] == len(dead)
+    assert report.retried >= len(dead)
+    assert sum(1 for size, _, _ in source.calls if size == 1) >= len(dead)
+
+
+def test_outage_on_warm_store_flags_stale_rows(tmp_path, market):
+    source = FakeSource(market)
+    store = make_store(tmp_path, source)
+    run_pipeline(list(market), store)
+
+    source.dead = set(market)
+    metrics, report = run_pipeline(list(market), store)
+    assert report.counts["ok"] == 0
+    assert report.counts["stale"] == len(metrics) > 0
+    assert metrics["Stale"].all()
+
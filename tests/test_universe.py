@@ -0,0 +1,74 @@
+import pytest
+
+from fake_source import FakeSource, synthetic_market
+from pipeline import AdaptiveBatcher, run_pipeline
+from price_store import PriceStore
+from universe import UniverseIndex
+
+
+@pytest.fixture
+def market():
+    return synthetic_market(40, days=260, seed=7, short_rate=0.0)
+
+
+@pytest.fixture
+def source(market):
+    return FakeSource(market)
+
+
+@pytest.fixture
+def store(tmp_path, source):
+    return PriceStore(root=str(tmp_path / "prices"), download=source)
+
+
+def scan(market, store, universe):
+    return run_pipeline(list(market), store, AdaptiveBatcher(size=10), universe=universe)
+
+
+def test_dead_after_consecutive_empty_scans(tmp_path, market, source, store):
+    dead = sorted(market)[0]
+    source.dead = {dead}
+    universe = UniverseIndex(path=str(tmp_path / "universe.json"), min_value=0)
+    for _ in range(universe.dead_after):
+        scan(market, store, universe)
+    assert universe.get(dead)["empty"] == universe.dead_after
+    assert universe.summary(list(market)) == {"active": len(market) - 1, "dead": 1}
+
+
+def test_outage_leaves_counters_alone(tmp_path, market, source, store):
+    universe = UniverseIndex(path=str(tmp_path / "universe.json"), min_value=0)
+    scan(market, store, universe)
+
+    source.dead = set(market)
+    for _ in range(universe.dead_after + 1):
+        scan(market, store, universe)
+    assert universe.summary(list(market)) == {"active": len(market)}
+    assert all(universe.get(t)["empty"] == 0 for t in market)
+
+
+def test_prune_never_skips_most_of_the_universe(tmp_path, market, store):
+    scan(market, store, UniverseIndex(path=str(tmp_path / "universe.json"), min_value=0))
+
+    universe = UniverseIndex(path=str(tmp_path / "universe.json"), min_value=float("inf"))
+    active, skipped = universe.prune(list(market))
+    assert set(skipped.values()) == {"illiquid"}
+    assert len(skipped) == int(len(market) * universe.max_skip_fraction)
+    assert len(active) + len(skipped) == len(market)
+
+
+def test_illiquid_volume_surge_is_scanned(tmp_path, market, source, store):
+    scan(market, store, UniverseIndex(path=str(tmp_path / "universe.json"), min_value=0))
+
+    universe = UniverseIndex(path=str(tmp_path / "universe.json"), min_value=float("inf"))
+    _, skipped = universe.prune(list(market))
+    surge = sorted(skipped)[-1]
+    frame = market[surge].copy()
+    frame.iloc[-1, frame.columns.get_loc("Volume")] *= 10
+    source.frames[surge] = frame
+
+    metrics, report = scan(market, store, universe)
+    assert surge in metrics.index
+    assert surge not in report.skipped
+    assert set(metrics.index).isdisjoint(report.skipped)
+    assert report.counts["skipped"] == len(report.skipped) < len(skipped)
+    assert len(metrics) + len(report.skipped) == len(market)
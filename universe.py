@@ -0,0 +1,288 @@
+import json
+import os
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+from indicators import panel
+from price_store import _atomic_json
+
+# Universe saham yang di-scan. Daftar default dipisah dari script Streamlit supaya
+# tidak dieksekusi ulang di tiap interaksi dan bisa dipakai jalur headless (CLI).
+# UniverseIndex menyimpan status tiap ticker dari scan sebelumnya supaya saham
+# mati / suspensi / tidak likuid tidak diunduh di setiap scan.
+
+INDEX_PATH = os.path.join("data", "universe_index.json")
+DEAD_AFTER = 3                     # Unduhan kosong berturut-turut -> dianggap mati (delisting)
+STALE_DAYS = 14                    # Bar terakhir lebih lama dari ini -> dianggap suspensi
+MIN_DAILY_VALUE = 100_000_000      # Rata-rata nilai transaksi harian minimum (Rupiah)
+VALUE_WINDOW = 20                  # Hari bursa untuk rata-rata nilai transaksi
+REPROBE_DAYS = {"dead": 7, "suspended": 3, "illiquid": 5}   # Jadwal probe ulang ticker yang dilewati
+OUTAGE_FRACTION = 0.5              # Porsi batch kosong yang dianggap gangguan sumber, bukan ticker mati
+MAX_SKIP_FRACTION = 0.5            # Porsi universe maksimum yang boleh dilewati dalam satu scan
+SURGE_RATIO = 2.0                  # Volume bar terakhir / rata-rata -> ticker tidak likuid tetap di-scan
+
+# List Saham Default (Tetap lengkap seperti asli)
+DEFAULT_STOCKS = ["AADI.JK", "AALI.JK", "ABBA.JK", "ABDA.JK", "ABMM.JK", "ACES.JK", "ACRO.JK", "ACST.JK",
+    "ADCP.JK", "ADES.JK", "ADHI.JK", "ADMF.JK", "ADMG.JK", "ADMR.JK", "ADRO.JK", "AEGS.JK",
+    "AGAR.JK", "AGII.JK", "AGRO.JK", "AGRS.JK", "AHAP.JK", "AIMS.JK", "AISA.JK", "AKKU.JK",
+    "AKPI.JK", "AKRA.JK", "AKSI.JK", "ALDO.JK", "ALII.JK", "ALKA.JK", "ALMI.JK", "ALTO.JK",
+    "AMAG.JK", "AMAN.JK", "AMAR.JK", "AMFG.JK", "AMIN.JK", "AMMN.JK", "AMMS.JK", "AMOR.JK",
+    "AMRT.JK", "ANDI.JK", "ANJT.JK", "ANTM.JK", "APEX.JK", "APIC.JK", "APII.JK", "APLI.JK",
+    "APLN.JK", "ARCI.JK", "AREA.JK", "ARGO.JK", "ARII.JK", "ARKA.JK", "ARKO.JK", "ARMY.JK",
+    "ARNA.JK", "ARTA.JK", "ARTI.JK", "ARTO.JK", "ASBI.JK", "ASDM.JK", "ASGR.JK", "ASHA.JK",
+    "ASII.JK", "ASJT.JK", "ASLC.JK", "ASLI.JK", "ASMI.JK", "ASPI.JK", "ASPR.JK", "ASRI.JK",
+    "ASRM.JK", "ASSA.JK", "ATAP.JK", "ATIC.JK", "ATLA.JK", "AUTO.JK", "AVIA.JK", "AWAN.JK",
+    "AXIO.JK", "AYAM.JK", "AYLS.JK", "BABP.JK", "BABY.JK", "BACA.JK", "BAIK.JK", "BAJA.JK",
+    "BALI.JK", "BANK.JK", "BAPA.JK", "BAPI.JK", "BATA.JK", "BATR.JK", "BAUT.JK", "BAYU.JK",
+    "BBCA.JK", "BBHI.JK", "BBKP.JK", "BBLD.JK", "BBMD.JK", "BBNI.JK", "BBRI.JK", "BBRM.JK",
+    "BBSI.JK", "BBSS.JK", "BBTN.JK", "BBYB.JK", "BCAP.JK", "BCIC.JK", "BCIP.JK", "BDKR.JK",
+    "BDMN.JK", "BEBS.JK", "BEEF.JK", "BEER.JK", "BEKS.JK", "BELI.JK", "BELL.JK", "BESS.JK",
+    "BEST.JK", "BFIN.JK", "BGTG.JK", "BHAT.JK", "BHIT.JK", "BIKA.JK", "BIKE.JK", "BIMA.JK",
+    "BINA.JK", "BINO.JK", "BIPI.JK", "BIPP.JK", "BIRD.JK", "BISI.JK", "BJBR.JK", "BJTM.JK",
+    "BKDP.JK", "BKSL.JK", "BKSW.JK", "BLES.JK", "BLOG.JK", "BLTA.JK", "BLTZ.JK", "BLUE.JK",
+    "BMAS.JK", "BMBL.JK", "BMHS.JK", "BMRI.JK", "BMSR.JK", "BMTR.JK", "BNBA.JK", "BNBR.JK",
+    "BNGA.JK", "BNII.JK", "BNLI.JK", "BOAT.JK", "BOBA.JK", "BOGA.JK", "BOLA.JK", "BOLT.JK",
+    "BOSS.JK", "BPFI.JK", "BPII.JK", "BPTR.JK", "BRAM.JK", "BREN.JK", "BRIS.JK", "BRMS.JK",
+    "BRNA.JK", "BRPT.JK", "BRRC.JK", "BSBK.JK", "BSDE.JK", "BSIM.JK", "BSML.JK", "BSSR.JK",
+    "BSWD.JK", "BTEK.JK", "BTEL.JK", "BTON.JK", "BTPN.JK", "BTPS.JK", "BUAH.JK", "BUDI.JK",
+    "BUKA.JK", "BUKK.JK", "BULL.JK", "BUMI.JK", "BUVA.JK", "BVIC.JK", "BWPT.JK", "BYAN.JK",
+    "CAKK.JK", "CAMP.JK", "CANI.JK", "CARE.JK", "CARS.JK", "CASA.JK", "CASH.JK", "CASS.JK",
+    "CBDK.JK", "CBMF.JK", "CBPE.JK", "CBRE.JK", "CBUT.JK", "CCSI.JK", "CDIA.JK", "CEKA.JK",
+    "CENT.JK", "CFIN.JK", "CGAS.JK", "CHEK.JK", "CHEM.JK", "CHIP.JK", "CINT.JK", "CITA.JK",
+    "CITY.JK", "CLAY.JK", "CLEO.JK", "CLPI.JK", "CMNP.JK", "CMNT.JK", "CMPP.JK", "CMRY.JK",
+    "CNKO.JK", "CNMA.JK", "CNTB.JK", "CNTX.JK", "COAL.JK", "COCO.JK", "COIN.JK", "COWL.JK",
+    "CPIN.JK", "CPRI.JK", "CPRO.JK", "CRAB.JK", "CRSN.JK", "CSAP.JK", "CSIS.JK", "CSMI.JK",
+    "CSRA.JK", "CTBN.JK", "CTRA.JK", "CTTH.JK", "CUAN.JK", "CYBR.JK", "DAAZ.JK", "DADA.JK",
+    "DART.JK", "DATA.JK", "DAYA.JK", "DCII.JK", "DEAL.JK", "DEFI.JK", "DEPO.JK", "DEWA.JK",
+    "DEWI.JK", "DFAM.JK", "DGIK.JK", "DGNS.JK", "DGWG.JK", "DIGI.JK", "DILD.JK", "DIVA.JK",
+    "DKFT.JK", "DKHH.JK", "DLTA.JK", "DMAS.JK", "DMMX.JK", "DMND.JK", "DNAR.JK", "DNET.JK",
+    "DOID.JK", "DOOH.JK", "DOSS.JK", "DPNS.JK", "DPUM.JK", "DRMA.JK", "DSFI.JK", "DSNG.JK",
+    "DSSA.JK", "DUCK.JK", "DUTI.JK", "DVLA.JK", "DWGL.JK", "DYAN.JK", "EAST.JK", "ECII.JK",
+    "EDGE.JK", "EKAD.JK", "ELIT.JK", "ELPI.JK", "ELSA.JK", "ELTY.JK", "EMAS.JK", "EMDE.JK",
+    "EMTK.JK", "ENAK.JK", "ENRG.JK", "ENVY.JK", "ENZO.JK", "EPAC.JK", "EPMT.JK", "ERAA.JK",
+    "ERAL.JK", "ERTX.JK", "ESIP.JK", "ESSA.JK", "ESTA.JK", "ESTI.JK", "ETWA.JK", "EURO.JK",
+    "EXCL.JK", "FAPA.JK", "FAST.JK", "FASW.JK", "FILM.JK", "FIMP.JK", "FIRE.JK", "FISH.JK",
+    "FITT.JK", "FLMC.JK", "FMII.JK", "FOLK.JK", "FOOD.JK", "FORE.JK", "FORU.JK", "FPNI.JK",
+    "ZONE.JK", "FUJI.JK", "FUTR.JK", "FWCT.JK", "GAMA.JK", "GDST.JK", "GDYR.JK", "GEMA.JK",
+    "GEMS.JK", "GGRM.JK", "GGRP.JK", "GHON.JK", "GIAA.JK", "GJTL.JK", "GLOB.JK", "GLVA.JK",
+    "GMFI.JK", "GMTD.JK", "GOLD.JK", "GOLF.JK", "GOLL.JK", "GOOD.JK", "GOTO.JK", "ZYRX.JK",
+    "GPRA.JK", "GPSO.JK", "GRIA.JK", "GRPH.JK", "GRPM.JK", "GSMF.JK", "GTBO.JK", "GTRA.JK",
+    "GTSI.JK", "GULA.JK", "GUNA.JK", "GWSA.JK", "GZCO.JK", "HADE.JK", "HAIS.JK", "HAJJ.JK",
+    "HALO.JK", "HATM.JK", "HBAT.JK", "HDFA.JK", "HDIT.JK", "HEAL.JK", "HELI.JK", "HERO.JK",
+    "HEXA.JK", "HGII.JK", "HILL.JK", "HITS.JK", "HKMU.JK", "HMSP.JK", "HOKI.JK", "HOME.JK",
+    "HOMI.JK", "HOPE.JK", "HOTL.JK", "HRME.JK", "HRTA.JK", "HRUM.JK", "HUMI.JK", "HYGN.JK",
+    "IATA.JK", "IBFN.JK", "IBOS.JK", "IBST.JK", "ICBP.JK", "ICON.JK", "IDEA.JK", "IDPR.JK",
+    "IFII.JK", "IFSH.JK", "IGAR.JK", "IIKP.JK", "IKAI.JK", "IKAN.JK", "IKBI.JK", "IKPM.JK",
+    "IMAS.JK", "IMJS.JK", "IMPC.JK", "INAF.JK", "INAI.JK", "INCF.JK", "INCI.JK", "INCO.JK",
+    "INDF.JK", "INDO.JK", "INDR.JK", "INDS.JK", "INDX.JK", "INDY.JK", "INET.JK", "INKP.JK",
+    "INOV.JK", "INPC.JK", "INPP.JK", "INPS.JK", "INRU.JK", "INTA.JK", "INTD.JK", "INTP.JK",
+    "IOTF.JK", "IPAC.JK", "IPCC.JK", "IPCM.JK", "IPOL.JK", "IPPE.JK", "IPTV.JK", "IRRA.JK",
+    "IRSX.JK", "ISAP.JK", "ISAT.JK", "ISEA.JK", "ISSP.JK", "ITIC.JK", "ITMA.JK", "ITMG.JK",
+    "JARR.JK", "JAST.JK", "JATI.JK", "JAWA.JK", "JAYA.JK", "JECC.JK", "JGLE.JK", "JIHD.JK",
+    "JKON.JK", "JMAS.JK", "JPFA.JK", "JRPT.JK", "JSKY.JK", "JSMR.JK", "JSPT.JK", "JTPE.JK",
+    "KAEF.JK", "KBLI.JK", "KBLM.JK", "KBRI.JK", "KDSI.JK", "KEEN.JK", "KEJU.JK", "KIAS.JK",
+    "KIJA.JK", "KING.JK", "KINO.JK", "KIOS.JK", "KJEN.JK", "KKES.JK", "KKGI.JK", "KLAS.JK",
+    "KLBF.JK", "KLIN.JK", "KMDS.JK", "KMTR.JK", "KOBX.JK", "KOCI.JK", "KOIN.JK", "KOKA.JK",
+    "KONI.JK", "KOPI.JK", "KOTA.JK", "KPIG.JK", "KRAS.JK", "KRYA.JK", "KSIX.JK", "KUAS.JK",
+    "LABA.JK", "LABS.JK", "LAJU.JK", "LAND.JK", "LAPD.JK", "LEAD.JK", "LIFE.JK", "LINK.JK",
+    "LION.JK", "LIVE.JK", "LMAS.JK", "LMAX.JK", "LMPI.JK", "LMSH.JK", "LOPI.JK", "LPCK.JK",
+    "LPGI.JK", "LPIN.JK", "LPKR.JK", "LPLI.JK", "LPPF.JK", "LPPS.JK", "LRNA.JK", "LSIP.JK",
+    "LTLS.JK", "LUCK.JK", "LUCY.JK", "MABA.JK", "MAGP.JK", "MAHA.JK", "MAIN.JK", "MANG.JK",
+    "MAPA.JK", "MAPB.JK", "MAPI.JK", "MARI.JK", "MARK.JK", "MASB.JK", "MAXI.JK", "MAYA.JK",
+    "MBAP.JK", "MBMA.JK", "MBSS.JK", "MBTO.JK", "MCAS.JK", "MCOL.JK", "MCOR.JK", "MDIA.JK",
+    "MDIY.JK", "MDKA.JK", "MDKI.JK", "MDLA.JK", "MDLN.JK", "MDRN.JK", "MEDC.JK", "MEDS.JK",
+    "MEGA.JK", "MEJA.JK", "MENN.JK", "MERI.JK", "MERK.JK", "META.JK", "MFMI.JK", "MGLV.JK",
+    "MGNA.JK", "MGRO.JK", "MHKI.JK", "MICE.JK", "MIDI.JK", "MIKA.JK", "MINA.JK", "MINE.JK",
+    "MIRA.JK", "MITI.JK", "MKAP.JK", "MKNT.JK", "MKPI.JK", "MKTR.JK", "MLBI.JK", "MLIA.JK",
+    "MLPL.JK", "MLPT.JK", "MMIX.JK", "MMLP.JK", "MNCN.JK", "MOLI.JK", "MORA.JK", "MPIX.JK",
+    "MPMX.JK", "MPOW.JK", "MPPA.JK", "MPRO.JK", "MPXL.JK", "MRAT.JK", "MREI.JK", "MSIE.JK",
+    "MSIN.JK", "MSJA.JK", "MSKY.JK", "MSTI.JK", "MTDL.JK", "MTEL.JK", "MTFN.JK", "MTLA.JK",
+    "MTMH.JK", "MTPS.JK", "MTRA.JK", "MTSM.JK", "MTWI.JK", "MUTU.JK", "MYOH.JK", "MYOR.JK",
+    "MYTX.JK", "NAIK.JK", "NANO.JK", "NASA.JK", "NASI.JK", "NATO.JK", "NAYZ.JK", "NCKL.JK",
+    "NELY.JK", "NEST.JK", "NETV.JK", "NFCX.JK", "NICE.JK", "NICK.JK", "NICL.JK", "NIKL.JK",
+    "NINE.JK", "NIRO.JK", "NISP.JK", "NOBU.JK", "NPGF.JK", "NRCA.JK", "NSSS.JK", "NTBK.JK",
+    "NUSA.JK", "NZIA.JK", "OASA.JK", "OBAT.JK", "OBMD.JK", "OCAP.JK", "OILS.JK", "OKAS.JK",
+    "OLIV.JK", "OMED.JK", "OMRE.JK", "OPMS.JK", "PACK.JK", "PADA.JK", "PADI.JK", "PALM.JK",
+    "PAMG.JK", "PANI.JK", "PANR.JK", "PANS.JK", "PART.JK", "PBID.JK", "PBRX.JK", "PBSA.JK",
+    "PCAR.JK", "PDES.JK", "PDPP.JK", "PEGE.JK", "PEHA.JK", "PEVE.JK", "PGAS.JK", "PGEO.JK",
+    "PGJO.JK", "PGLI.JK", "PGUN.JK", "PICO.JK", "PIPA.JK", "PJAA.JK", "PJHB.JK", "PKPK.JK",
+    "PLAN.JK", "PLAS.JK", "PLIN.JK", "PMJS.JK", "PMMP.JK", "PMUI.JK", "PNBN.JK", "PNBS.JK",
+    "PNGO.JK", "PNIN.JK", "PNLF.JK", "PNSE.JK", "POLA.JK", "POLI.JK", "POLL.JK", "POLU.JK",
+    "POLY.JK", "POOL.JK", "PORT.JK", "POSA.JK", "POWR.JK", "PPGL.JK", "PPRE.JK", "PPRI.JK",
+    "PPRO.JK", "PRAY.JK", "PRDA.JK", "PRIM.JK", "PSAB.JK", "PSAT.JK", "PSDN.JK", "PSGO.JK",
+    "PSKT.JK", "PSSI.JK", "PTBA.JK", "PTDU.JK", "PTIS.JK", "PTMP.JK", "PTMR.JK", "PTPP.JK",
+    "PTPS.JK", "PTPW.JK", "PTRO.JK", "PTSN.JK", "PTSP.JK", "PUDP.JK", "PURA.JK", "PURE.JK",
+    "PURI.JK", "PWON.JK", "PYFA.JK", "PZZA.JK", "RAAM.JK", "RAFI.JK", "RAJA.JK", "RALS.JK",
+    "RANC.JK", "RATU.JK", "RBMS.JK", "RCCC.JK", "RDTX.JK", "REAL.JK", "RELF.JK", "RELI.JK",
+    "RGAS.JK", "RICY.JK", "RIGS.JK", "RIMO.JK", "RISE.JK", "RLCO.JK", "RMKE.JK", "RMKO.JK",
+    "ROCK.JK", "RODA.JK", "RONY.JK", "ROTI.JK", "RSCH.JK", "RSGK.JK", "RUIS.JK", "RUNS.JK",
+    "SAFE.JK", "SAGE.JK", "SAME.JK", "SAMF.JK", "SAPX.JK", "SATU.JK", "SBAT.JK", "SBMA.JK",
+    "SCCO.JK", "SCMA.JK", "SCNP.JK", "SCPI.JK", "SDMU.JK", "SDPC.JK", "SDRA.JK", "SEMA.JK",
+    "SFAN.JK", "SGER.JK", "SGRO.JK", "SHID.JK", "SHIP.JK", "SICO.JK", "SIDO.JK", "SILO.JK",
+    "SIMA.JK", "SIMP.JK", "SINI.JK", "SIPD.JK", "SKBM.JK", "SKLT.JK", "SKRN.JK", "SKYB.JK",
+    "SLIS.JK", "SMAR.JK", "SMBR.JK", "SMCB.JK", "SMDM.JK", "SMDR.JK", "SMGA.JK", "SMGR.JK",
+    "SMIL.JK", "SMKL.JK", "SMKM.JK", "SMLE.JK", "SMMA.JK", "SMMT.JK", "SMRA.JK", "SMRU.JK",
+    "SMSM.JK", "SNLK.JK", "SOCI.JK", "SOFA.JK", "SOHO.JK", "SOLA.JK", "SONA.JK", "SOSS.JK",
+    "SOTS.JK", "SOUL.JK", "SPMA.JK", "SPRE.JK", "SPTO.JK", "SQMI.JK", "SRAJ.JK", "SRIL.JK",
+    "SRSN.JK", "SRTG.JK", "SSIA.JK", "SSMS.JK", "SSTM.JK", "STAA.JK", "STAR.JK", "STRK.JK",
+    "STTP.JK", "SUGI.JK", "SULI.JK", "SUNI.JK", "SUPA.JK", "SUPR.JK", "SURE.JK", "SURI.JK",
+    "SWAT.JK", "SWID.JK", "TALF.JK", "TAMA.JK", "TAMU.JK", "TAPG.JK", "TARA.JK", "TAXI.JK",
+    "TAYS.JK", "TBIG.JK", "TBLA.JK", "TBMS.JK", "TCID.JK", "TCPI.JK", "TDPM.JK", "TEBE.JK",
+    "TECH.JK", "TELE.JK", "TFAS.JK", "TFCO.JK", "TGKA.JK", "TGRA.JK", "TGUK.JK", "TIFA.JK",
+    "TINS.JK", "TIRA.JK", "TIRT.JK", "TKIM.JK", "TLDN.JK", "TLKM.JK", "TMAS.JK", "TMPO.JK",
+    "TNCA.JK", "TOBA.JK", "TOOL.JK", "TOPS.JK", "TOSK.JK", "TOTL.JK", "TOTO.JK", "TOWR.JK",
+    "TOYS.JK", "TPMA.JK", "TRAM.JK", "TRGU.JK", "TRIL.JK", "TRIM.JK", "TRIN.JK", "TRIO.JK",
+    "TRIS.JK", "TRJA.JK", "TRON.JK", "TRST.JK", "TRUE.JK", "TRUK.JK", "TRUS.JK", "TSPC.JK",
+    "TUGU.JK", "TYRE.JK", "UANG.JK", "UCID.JK", "UDNG.JK", "UFOE.JK", "ULTJ.JK", "UNIC.JK",
+    "UNIQ.JK", "UNIT.JK", "UNSP.JK", "UNTD.JK", "UNTR.JK", "UNVR.JK", "URBN.JK", "UVCR.JK",
+    "VAST.JK", "VERN.JK", "VICI.JK", "VICO.JK", "VINS.JK", "VISI.JK", "VIVA.JK", "VKTR.JK",
+    "VOKS.JK", "VRNA.JK", "VTNY.JK", "WAPO.JK", "WEGE.JK", "WEHA.JK", "WGSH.JK", "WICO.JK",
+    "WIDI.JK", "WIFI.JK", "WIIM.JK", "WIKA.JK", "WINE.JK", "WINR.JK", "WINS.JK", "WIRG.JK",
+    "WMPP.JK", "WMUU.JK", "WOMF.JK", "WOOD.JK", "WOWS.JK", "WSBP.JK", "WSKT.JK", "WTON.JK",
+    "YELO.JK", "YOII.JK", "YPAS.JK", "YULE.JK", "YUPI.JK", "ZATA.JK", "ZBRA.JK", "ZINC.JK"]
+
+
+def clean_tickers(codes):
+    """Normalisasi kode saham ke format Yahoo ('BBCA' / 'BBCA.JK ' -> 'BBCA.JK')."""
+    return [f"{str(s).strip().replace('.JK', '')}.JK" for s in codes]
+
+
+def read_excel_codes(source):
+    """Kode saham dari Excel IDX (kolom B, baris pertama header)."""
+    df_upload = pd.read_excel(source, header=None)
+    return df_upload.iloc[1:, 1].dropna().unique().tolist()
+
+
+def load_universe(path=None):
+    """
+    Universe dari file (tickers.csv dengan kolom 'ticker', atau Excel IDX),
+    atau DEFAULT_STOCKS jika `path` kosong.
+    """
+    if not path:
+        return list(DEFAULT_STOCKS)
+    if path.endswith((".xlsx", ".xls")):
+        return clean_tickers(read_excel_codes(path))
+    return clean_tickers(pd.read_csv(path)["ticker"].dropna().tolist())
+
+
+class UniverseIndex:
+    """
+    Status per ticker dari scan sebelumnya, dipersist ke JSON: tanggal bar terakhir,
+    rata-rata nilai transaksi harian, jumlah unduhan kosong berturut-turut, dan
+    tanggal terakhir diunduh. Ticker mati / suspensi / tidak likuid dilewati scan
+    dan hanya di-probe ulang sesuai REPROBE_DAYS; ticker tidak likuid juga di-scan
+    lagi begitu unduhan inkrementalnya menunjukkan lonjakan volume.
+    """
+
+    def __init__(self, path=INDEX_PATH, min_value=MIN_DAILY_VALUE, dead_after=DEAD_AFTER,
+                 stale_days=STALE_DAYS, reprobe_days=None, outage_fraction=OUTAGE_FRACTION,
+                 max_skip_fraction=MAX_SKIP_FRACTION, surge_ratio=SURGE_RATIO):
+        self.path = path
+        self.min_value = min_value
+        self.dead_after = dead_after
+        self.stale_days = stale_days
+        self.reprobe_days = dict(REPROBE_DAYS, **(reprobe_days or {}))
+        self.outage_fraction = outage_fraction
+        self.max_skip_fraction = max_skip_fraction
+        self.surge_ratio = surge_ratio
+        self._lock = threading.Lock()
+        try:
+            with open(path) as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._lock:
+            _atomic_json(self.path, self._entries)
+
+    def get(self, ticker):
+        with self._lock:
+            entry = self._entries.get(ticker)
+        return dict(entry) if entry else None
+
+    def status(self, ticker, today=None):
+        """'dead', 'suspended', 'illiquid', atau None (aktif / belum dikenal)."""
+        entry = self.get(ticker)
+        if not entry:
+            return None
+        today = today or datetime.now().date()
+        if entry["empty"] >= self.dead_after:
+            return "dead"
+        if entry["last_bar"] and (today - _date(entry["last_bar"])).days > self.stale_days:
+            return "suspended"
+        if entry["value"] is not None and entry["value"] < self.min_value:
+            return "illiquid"
+        return None
+
+    def prune(self, tickers, today=None):
+        """
+        Pisahkan ticker yang perlu diunduh dari yang dilewati. Ticker bermasalah tetap
+        diunduh jika jadwal probe ulangnya sudah tiba. Paling banyak `max_skip_fraction`
+        universe yang dilewati; kelebihannya (yang paling lama tidak dicek) di-probe
+        ulang. Mengembalikan (aktif, {ticker: alasan}).
+        """
+        today = today or datetime.now().date()
+        skipped, checked = {}, {}
+        for ticker in tickers:
+            reason = self.status(ticker, today)
+            checked[ticker] = (self.get(ticker) or {}).get("checked")
+            if reason and checked[ticker] and (today - _date(checked[ticker])).days < self.reprobe_days[reason]:
+                skipped[ticker] = reason
+        # Index yang rusak / salah catat tidak boleh mengosongkan scan
+        limit = int(len(tickers) * self.max_skip_fraction)
+        for ticker in sorted(skipped, key=lambda t: checked[t])[:max(len(skipped) - limit, 0)]:
+            del skipped[ticker]
+        return [t for t in tickers if t not in skipped], skipped
+
+    def surging(self, data, tickers):
+        """Ticker yang volume bar terakhirnya >= `surge_ratio` x rata-rata VALUE_WINDOW bar."""
+        volume = panel(data, "Volume", tickers)
+        surging = set()
+        for ticker in volume.columns:
+            bars = volume[ticker].dropna().tail(VALUE_WINDOW)
+            if len(bars) and bars.mean() > 0 and bars.iloc[-1] >= self.surge_ratio * bars.mean():
+                surging.add(ticker)
+        return surging
+
+    def observe(self, tickers, data, empty=(), today=None):
+        """
+        Catat hasil unduhan satu batch (data = MultiIndex (Ticker, Price) dari PriceStore).
+        Jika >= `outage_fraction` batch kosong, itu gangguan sumber (throttle / down):
+        penghitung kosong per ticker tidak disentuh. Mengembalikan True untuk batch seperti itu.
+        """
+        today = today or datetime.now().date()
+        close = panel(data, "Close", tickers)
+        value = (close * panel(data, "Volume", tickers)).tail(VALUE_WINDOW).mean()
+        last_bars = close.apply(pd.Series.last_valid_index) if len(close.columns) else pd.Series(dtype=object)
+        empty = set(empty)
+        missing = {t for t in tickers if t in empty or pd.isna(last_bars.get(t))}
+        outage = len(tickers) > 1 and len(missing) >= self.outage_fraction * len(tickers)
+        with self._lock:
+            for ticker in tickers:
+                if outage and ticker in missing:
+                    continue
+                entry = self._entries.setdefault(ticker, {"last_bar": None, "value": None, "empty": 0})
+                entry["checked"] = today.strftime("%Y-%m-%d")
+                if ticker in missing:
+                    entry["empty"] += 1
+                    continue
+                entry["empty"] = 0
+                entry["last_bar"] = pd.Timestamp(last_bars[ticker]).strftime("%Y-%m-%d")
+                entry["value"] = None if pd.isna(value.get(ticker)) else round(float(value[ticker]))
+        return outage
+
+    def summary(self, tickers, today=None):
+        """Jumlah ticker per status untuk `tickers` (dipakai CLI / app)."""
+        counts = {}
+        for ticker in tickers:
+            reason = self.status(ticker, today) or "active"
+            counts[reason] = counts.get(reason, 0) + 1
+        return counts
+
+
+def _date(text):
+    return datetime.strptime(text, "%Y-%m-%d").date()